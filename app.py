@@ -1,14 +1,44 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import LabelEncoder, OneHotEncoder
-import io
+import json
+import os
+import time
+import uuid
 import warnings
+from collections import deque
+from ingestion import FrameCache, load_csv, options_key, parse_schema, read_header
+from profiling import ColumnProfileCache, ColumnVersions
+from exporting import ExportCache, available_formats, densify, export_filename, export_mime
+from cleaning import (DEFAULT_UNITS, FILL_METHODS, convert_numeric, drop_columns, fill_missing,
+                      missing_rows_mask, parse_unit_table)
+from dataset_store import DEFAULT_DISK_BYTES, DEFAULT_MEMORY_BYTES, DatasetStore, store_available
+from duplicates import KEEP_OPTIONS, DuplicateIndex
+from encoding import (OTHER_LABEL, estimate_one_hot, label_encode, mappings_from_json, mappings_to_json,
+                      one_hot_encode)
+from history import DEFAULT_UNDO_BYTES, ColumnStep, FillStep, OperationLog, RowStep
+from charts import (DEFAULT_MISSING_BUCKETS, DEFAULT_SCATTER_GRID, DEFAULT_SCATTER_THRESHOLD, MISSING_ORDERS,
+                    bar_plot, box_plot, correlation_heatmap, histogram, kde_plot, missing_matrix_figure,
+                    scatter_plot, stacked_bar, top_values_plot)
+from correlation import (CORRELATION_METHODS, DEFAULT_HEATMAP_COLUMNS, DEFAULT_TOP_PAIRS, CorrelationCache,
+                         cluster_order, clustering_available, top_pairs)
+from figure_cache import FigureCache
+import instrumentation
+from instrumentation import COUNTERS, DEFAULT_HISTORY, JsonlLog
+from grouping import (AGGREGATIONS, DEFAULT_PRESETS, GroupByEngine, preset_columns, presets_from_json,
+                      presets_to_json)
+from sampling import DEFAULT_SAMPLE_ROWS, DEFAULT_SEED, SAMPLING_METHODS, SampleCache
+from sketches import DEFAULT_HEAVY_HITTERS, with_bounds
+from viewer import DEFAULT_PAGE_ROWS, FILTER_OPERATORS, MAX_PREVIEW_ROWS, PAGE_SIZES, ViewCache
 
 warnings.filterwarnings('ignore')
 
+# Copy-on-write: the working frame shares data with the cached original until a column is changed
+pd.set_option('mode.copy_on_write', True)
+
+# Text-like dtypes, including Arrow-backed strings and compacted categories
+TEXT_DTYPES = ['object', 'string', 'category']
+
 # Set page configuration
 st.set_page_config(page_title="Data Cleaning & EDA Tool", layout="wide")
 
@@ -18,9 +48,6 @@ st.markdown("""
     .main {
         padding-top: 2rem;
     }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 2px;
-    }
     </style>
 """, unsafe_allow_html=True)
 
@@ -28,40 +55,275 @@ st.markdown("""
 st.title("📊 Data Cleaning & Exploratory Data Analysis Tool")
 st.markdown("---")
 
+# Instrumentation: every rerun is timed and its scans and copies counted
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+    st.session_state.rerun_count = 0
+    st.session_state.rerun_log = deque(maxlen=DEFAULT_HISTORY)
+st.session_state.rerun_count += 1
+instrumentation.start_rerun(st.session_state.session_id, st.session_state.rerun_count)
+
+
+@st.cache_resource
+def get_profile_log():
+    """JSON Lines log of every rerun, enabled by the EDA_PROFILE_LOG environment variable."""
+    path = os.environ.get('EDA_PROFILE_LOG')
+    return JsonlLog(path) if path else None
+
+
 # Initialize session state
 if 'df' not in st.session_state:
     st.session_state.df = None
 if 'df_original' not in st.session_state:
     st.session_state.df_original = None
+if 'upload_id' not in st.session_state:
+    st.session_state.upload_id = None
+if 'dataset_key' not in st.session_state:
+    st.session_state.dataset_key = None
+
+
+def reset_profile():
+    """Start a fresh column statistics cache for a newly loaded dataset."""
+    # The frame counter restarts at 0, so a new generation keeps dataset_version() from repeating
+    st.session_state.generation = st.session_state.get('generation', 0) + 1
+    st.session_state.versions = ColumnVersions()
+    st.session_state.profile_cache = ColumnProfileCache(st.session_state.versions)
+    st.session_state.duplicate_index = DuplicateIndex(st.session_state.versions)
+    st.session_state.groupby_engine = GroupByEngine(st.session_state.versions)
+
+
+def mark_changed(columns=None):
+    """Invalidate cached statistics for the columns a step touched (None = all)."""
+    st.session_state.versions.bump(columns)
+    st.session_state.profile_cache.prune(st.session_state.df.columns)
+    st.session_state.duplicate_index.prune(st.session_state.df.columns)
+    st.session_state.groupby_engine.prune(st.session_state.df.columns)
+
+
+def start_dataset(df_source):
+    """Make a lazy copy of ``df_source`` the working frame with empty history."""
+    st.session_state.df = df_source.copy(deep=False)
+    st.session_state.op_log.clear()
+    reset_profile()
+    # Charts, samples, correlation matrices, viewer row orders and exports of the previous generation can no longer be hit
+    for cache in ['figure_cache', 'sample_cache', 'correlation_cache', 'view_cache', 'export_cache']:
+        if cache in st.session_state:
+            st.session_state[cache].clear()
+
+
+def keep_fingerprints(step, before, after):
+    """Carry duplicate fingerprints over a row-dropping step instead of rehashing."""
+    if isinstance(step, RowStep) and before.index.is_unique:
+        st.session_state.duplicate_index.keep_rows(before, before.index.get_indexer(after.index))
+
+
+def apply_step(step):
+    """Apply a cleaning or encoding step to the working frame and record it for undo."""
+    before = st.session_state.df
+    df_new, touched = st.session_state.op_log.apply(before, step)
+    keep_fingerprints(step, before, df_new)
+    st.session_state.df = df_new
+    mark_changed(touched)
+    return df_new
+
+
+if 'groupby_engine' not in st.session_state:
+    reset_profile()
+if 'op_log' not in st.session_state:
+    st.session_state.op_log = OperationLog()
+if 'figure_cache' not in st.session_state:
+    st.session_state.figure_cache = FigureCache()
+
+
+def dataset_version():
+    """Identifies the current contents of the working frame."""
+    return (st.session_state.dataset_key, st.session_state.generation, st.session_state.versions.frame)
+
+
+def show_chart(chart, build, df, *params, data_key=None):
+    """Show a chart, reusing the rendered image while the data and parameters are unchanged.
+
+    ``data_key`` identifies ``df`` when it is derived from the working frame, e.g. a sample.
+    """
+    figure_cache = st.session_state.figure_cache
+    with instrumentation.span(chart, 'chart') as entry:
+        hits = figure_cache.hits
+        image = figure_cache.render(
+            (dataset_version(), data_key, chart, params),
+            lambda: build(df, *params)
+        )
+        if entry is not None:
+            entry['cached'] = figure_cache.hits > hits
+    st.image(image, use_column_width=True)
+
+
+def show_frame(frame):
+    """``st.write`` a frame; sparse columns (sparse one-hot output) are shown densified."""
+    st.write(densify(frame))
+
+
+def approx_unique_text(profile, df, col):
+    estimate, error = profile.approx_nunique(df, col)
+    return f"≈ {estimate:,} (±{error:.1%})" if error else f"{estimate:,}"
+
+
+# Parsed uploads shared by all sessions, keyed by content hash and load options
+@st.cache_resource
+def get_dataset_store():
+    """Memory-mapped dataset store (in-memory FrameCache without pyarrow).
+
+    EDA_STORE_DIR puts its files on a local disk other than the temp
+    directory; EDA_STORE_MEMORY_MB and EDA_STORE_DISK_MB set its budgets.
+    """
+    if not store_available():
+        return FrameCache()
+    memory_mb = os.environ.get('EDA_STORE_MEMORY_MB')
+    disk_mb = os.environ.get('EDA_STORE_DISK_MB')
+    return DatasetStore(
+        os.environ.get('EDA_STORE_DIR'),
+        memory_bytes=int(float(memory_mb) * 1024 ** 2) if memory_mb else DEFAULT_MEMORY_BYTES,
+        disk_bytes=int(float(disk_mb) * 1024 ** 2) if disk_mb else DEFAULT_DISK_BYTES,
+    )
+
 
 # Sidebar for file upload
 st.sidebar.header("📁 Data Upload")
 uploaded_file = st.sidebar.file_uploader("Upload CSV file", type=['csv'])
 
 if uploaded_file is not None:
+    # Load options: parser engine, dtypes, schema and column projection
+    with st.sidebar.expander("⚙️ Load Options"):
+        parser = st.radio("CSV parser:", ["Default (C engine)", "PyArrow (multi-threaded)"], key="load_engine")
+        arrow_dtypes = st.checkbox("Keep Arrow-backed dtypes", key="load_arrow_dtypes")
+        
+        if st.session_state.get('header_id') != uploaded_file.file_id:
+            try:
+                st.session_state.header_columns = read_header(uploaded_file.getvalue())
+            except Exception:
+                st.session_state.header_columns = []
+            st.session_state.header_id = uploaded_file.file_id
+        usecols = st.multiselect("Columns to load (empty = all):", st.session_state.header_columns, key="load_usecols")
+        schema_text = st.text_area("Column schema (one 'column: dtype' per line):", key="load_schema",
+                                   placeholder="Company: category\nPrice: float32")
+        compact = st.checkbox("Compact memory on load", key="load_compact",
+                              help="Store low-cardinality text columns as category and downcast numeric columns")
+    
     try:
-        st.session_state.df = pd.read_csv(uploaded_file)
-        st.session_state.df_original = st.session_state.df.copy()
-        st.sidebar.success("✅ File loaded successfully!")
-    except Exception as e:
-        st.sidebar.error(f"Error reading file: {e}")
+        load_options = {
+            'engine': 'pyarrow' if parser.startswith("PyArrow") else 'c',
+            'arrow_dtypes': arrow_dtypes,
+            'dtype': parse_schema(schema_text),
+            'usecols': usecols,
+        }
+    except ValueError as e:
+        st.sidebar.error(f"Invalid schema: {e}")
+        load_options = None
+    
+    # Only parse when a new file is uploaded or the load options change, not on every rerun
+    load_id = f"{uploaded_file.file_id}:{options_key(load_options)}:{compact}"
+    if load_options is not None and load_id != st.session_state.upload_id:
+        try:
+            with instrumentation.span("upload", 'upload'):
+                store = get_dataset_store()
+                key, df_loaded, from_cache, load_stats = load_csv(
+                    uploaded_file.getvalue(), store, options=load_options, compact=compact
+                )
+            # The stored frame is shared and read-only; the working frame copies its columns only when they change
+            st.session_state.df_original = df_loaded
+            # Keeps the dataset from being evicted while this session uses it (replacing the lease releases the last one)
+            st.session_state.dataset_lease = store.acquire(key) if isinstance(store, DatasetStore) else None
+            start_dataset(df_loaded)
+            st.session_state.upload_id = load_id
+            st.session_state.dataset_key = key
+            st.session_state.loaded_from_cache = from_cache
+            st.session_state.load_stats = load_stats
+        except Exception as e:
+            st.session_state.upload_id = None
+            st.sidebar.error(f"Error reading file: {e}")
+    
+    if st.session_state.upload_id == load_id:
+        if st.session_state.get('loaded_from_cache'):
+            st.sidebar.success("✅ File loaded successfully! (cached)")
+        else:
+            st.sidebar.success("✅ File loaded successfully!")
+        
+        load_stats = st.session_state.load_stats
+        rss = load_stats['rss_bytes']
+        if st.session_state.get('loaded_from_cache'):
+            st.sidebar.caption(f"⏱️ Served from cache · {load_stats['rows']:,} rows"
+                               + (f" · RSS {rss / 1024 ** 2:,.0f} MB" if rss else ""))
+        else:
+            rate = load_stats['rows_per_second']
+            st.sidebar.caption(f"⏱️ Parsed in {load_stats['parse_seconds']:.2f}s"
+                               + (f" · {rate:,.0f} rows/s" if rate else "")
+                               + (f" · RSS {rss / 1024 ** 2:,.0f} MB" if rss else ""))
+
+# Undo/redo of cleaning and encoding steps
+if st.session_state.df is not None:
+    op_log = st.session_state.op_log
+    with st.sidebar.expander("↩️ History"):
+        col1, col2 = st.columns(2)
+        with col1:
+            undo_clicked = st.button("↩️ Undo", disabled=not op_log.can_undo, key="undo_btn")
+        with col2:
+            redo_clicked = st.button("↪️ Redo", disabled=not op_log.can_redo, key="redo_btn")
+        
+        if undo_clicked and op_log.can_undo:
+            st.session_state.df, touched, step = op_log.undo(st.session_state.df)
+            mark_changed(touched)
+            st.info(f"Undid: {step.label}")
+        elif redo_clicked and op_log.can_redo:
+            before = st.session_state.df
+            st.session_state.df, touched, step = op_log.redo(before)
+            keep_fingerprints(step, before, st.session_state.df)
+            mark_changed(touched)
+            st.info(f"Redid: {step.label}")
+        
+        steps = op_log.history()
+        if steps:
+            for i, label in enumerate(steps, 1):
+                st.write(f"{i}. {label}")
+        else:
+            st.caption("No steps applied yet.")
+        for label in op_log.redo_labels():
+            st.caption(f"↪️ {label}")
+        
+        budget_mb = st.number_input("Undo memory budget (MB):", min_value=1,
+                                    value=DEFAULT_UNDO_BYTES // 1024 ** 2, key="undo_budget_mb")
+        op_log.max_bytes = budget_mb * 1024 ** 2
+        st.caption(f"Undo data: {op_log.nbytes / 1024 ** 2:,.2f} MB")
+        if op_log.forgotten:
+            st.caption(f"{op_log.forgotten} older step(s) dropped to stay within budget")
 
 # Main content
 if st.session_state.df is not None:
     df = st.session_state.df
+    profile = st.session_state.profile_cache
+    duplicate_index = st.session_state.duplicate_index
+    
+    # Approximate mode: summary statistics and unique values come from one-pass mergeable sketches
+    approx = st.sidebar.checkbox("⚡ Approximate statistics", value=False, key="approx_stats",
+                                 help="Faster summaries for very large files, shown with error bounds")
+    # Column statistics for many columns at once are computed on a thread pool
+    profile.max_workers = st.sidebar.slider("Profiling workers:", 1, max(os.cpu_count() or 1, 2),
+                                            os.cpu_count() or 1, key="profile_workers")
     
-    # Create tabs
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    # Section navigation: unlike st.tabs, only the selected section runs on a rerun
+    SECTIONS = [
         "📈 Dataset Overview",
         "🔍 Data Exploration",
         "🧹 Data Cleaning",
         "🏷️ Categorical Encoding",
         "📊 Visualizations & Analysis",
         "📥 Download"
-    ])
+    ]
+    section = st.radio("Section:", SECTIONS, horizontal=True, key="section", label_visibility="collapsed")
+    st.markdown("---")
+    section_start = time.perf_counter()
+    section_span = instrumentation.begin(section, 'section')
     
     # ============ TAB 1: DATASET OVERVIEW ============
-    with tab1:
+    if section == SECTIONS[0]:
         st.header("Dataset Overview")
         
         col1, col2, col3, col4 = st.columns(4)
@@ -71,9 +333,9 @@ if st.session_state.df is not None:
         with col2:
             st.metric("📋 Columns", df.shape[1])
         with col3:
-            st.metric("❌ Missing Values", df.isnull().sum().sum())
+            st.metric("❌ Missing Values", profile.null_counts(df).sum())
         with col4:
-            st.metric("🔁 Duplicates", df.duplicated().sum())
+            st.metric("🔁 Duplicates", duplicate_index.duplicated_count(df))
         
         st.subheader("Data Preview")
         
@@ -81,20 +343,68 @@ if st.session_state.df is not None:
         
         with col1:
             if st.button("🔝 Show Head (5 rows)"):
-                st.write(df.head())
+                show_frame(df.head())
         
         with col2:
             if st.button("🔚 Show Tail (5 rows)"):
-                st.write(df.tail())
+                show_frame(df.tail())
         
         with col3:
-            rows_to_show = st.number_input("Show custom rows:", min_value=1, max_value=len(df), value=10)
+            preview_limit = max(min(len(df), MAX_PREVIEW_ROWS), 1)
+            rows_to_show = st.number_input("Show custom rows:", min_value=1, max_value=preview_limit,
+                                           value=min(10, preview_limit),
+                                           help="Use the paginated viewer below to browse more rows")
             if st.button("📄 Show Custom Rows"):
-                st.write(df.head(rows_to_show))
+                show_frame(df.head(rows_to_show))
         
         st.subheader("Show All Rows")
         if st.checkbox("Display full dataset (all rows)"):
-            st.write(df)
+            # Paginated: only the rows of the current page are sent to the browser
+            if 'view_cache' not in st.session_state:
+                st.session_state.view_cache = ViewCache()
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                view_columns = st.multiselect("Columns (empty = all):", df.columns, key="view_columns")
+            with col2:
+                view_sort = st.selectbox("Sort by:", ["(none)", *df.columns], key="view_sort")
+            with col3:
+                view_descending = st.checkbox("Descending", key="view_descending")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                view_filter_col = st.selectbox("Filter column:", ["(none)", *df.columns], key="view_filter_col")
+            with col2:
+                view_filter_op = st.selectbox("Condition:", FILTER_OPERATORS, key="view_filter_op")
+            with col3:
+                view_filter_value = st.text_input("Value:", key="view_filter_value")
+            
+            filter_by = None
+            if view_filter_col != "(none)" and (view_filter_value or view_filter_op.startswith("is ")):
+                filter_by = (view_filter_col, view_filter_op, view_filter_value)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                page_rows = st.selectbox("Rows per page:", PAGE_SIZES,
+                                         index=PAGE_SIZES.index(DEFAULT_PAGE_ROWS), key="view_page_rows")
+            with col2:
+                page = st.number_input("Page:", min_value=1, value=1, key="view_page")
+            
+            try:
+                page_df, view_rows, page = st.session_state.view_cache.page(
+                    df, dataset_version(), page, page_rows, view_columns,
+                    sort_by=None if view_sort == "(none)" else view_sort,
+                    ascending=not view_descending, filter_by=filter_by
+                )
+            except ValueError as e:
+                st.error(f"Invalid filter: {e}")
+            else:
+                pages = max(-(-view_rows // page_rows), 1)
+                first = (page - 1) * page_rows
+                st.caption(f"Rows {first + min(1, len(page_df)):,}–{first + len(page_df):,} of {view_rows:,}"
+                           + (f" (filtered from {len(df):,})" if filter_by else "")
+                           + f" · page {page:,} of {pages:,}")
+                show_frame(page_df)
         
         st.subheader("Column Information")
         
@@ -112,9 +422,27 @@ if st.session_state.df is not None:
         
         st.subheader("Dataset Shape")
         st.info(f"**Shape:** {df.shape[0]} rows × {df.shape[1]} columns")
+        
+        compaction = st.session_state.get('load_stats', {}).get('compaction')
+        if compaction is not None:
+            st.subheader("Memory Compaction")
+            bytes_before = compaction['Bytes Before'].sum()
+            bytes_after = compaction['Bytes After'].sum()
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("💾 Memory Before", f"{bytes_before / 1024 ** 2:,.2f} MB")
+            with col2:
+                st.metric("💾 Memory After", f"{bytes_after / 1024 ** 2:,.2f} MB")
+            with col3:
+                saved = (1 - bytes_after / bytes_before) * 100 if bytes_before else 0
+                st.metric("📉 Saved", f"{saved:.1f}%")
+            
+            with st.expander("Per-column memory report"):
+                st.write(compaction[compaction['Dtype Before'] != compaction['Dtype After']])
     
     # ============ TAB 2: DATA EXPLORATION ============
-    with tab2:
+    if section == SECTIONS[1]:
         st.header("Data Exploration & Analysis")
         
         exploration_option = st.radio(
@@ -124,53 +452,69 @@ if st.session_state.df is not None:
         
         if exploration_option == "Summary Statistics":
             st.subheader("Summary Statistics")
-            st.write(df.describe(include='all'))
-            
-            # Display numeric summary
             numeric_cols = df.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) > 0:
-                st.write("\n**Numeric Columns Summary:**")
-                st.write(df[numeric_cols].describe())
+            if approx:
+                st.caption("≈ Approximate: count, mean, std, min and max are exact. Unique counts are "
+                           "HyperLogLog estimates with their relative error at 95% confidence; quartiles come "
+                           "from a sample whose rank error is shown; freq may be undercounted by the shown amount.")
+                st.write(with_bounds(*profile.approx_describe(df)))
+                if len(numeric_cols) > 0:
+                    st.write("\n**Numeric Columns Summary:**")
+                    st.write(with_bounds(*profile.approx_describe(df, numeric_cols)))
+            else:
+                st.write(profile.describe(df))
+                
+                # Display numeric summary
+                if len(numeric_cols) > 0:
+                    st.write("\n**Numeric Columns Summary:**")
+                    st.write(profile.describe(df, numeric_cols))
         
         elif exploration_option == "Data Types":
             st.subheader("Data Types Info")
             dtype_info = pd.DataFrame({
                 'Column': df.columns,
                 'Data Type': df.dtypes.values,
-                'Non-Null Count': df.count().values,
-                'Null Count': df.isnull().sum().values
+                'Non-Null Count': profile.counts(df).values,
+                'Null Count': profile.null_counts(df).values
             })
             st.write(dtype_info)
         
         elif exploration_option == "Missing Values":
             st.subheader("Missing Values Analysis")
             
+            null_counts = profile.null_counts(df).values
             missing_data = pd.DataFrame({
                 'Column': df.columns,
-                'Missing Count': df.isnull().sum().values,
-                'Missing %': (df.isnull().sum().values / len(df) * 100).round(2)
+                'Missing Count': null_counts,
+                'Missing %': (null_counts / len(df) * 100).round(2)
             })
             missing_data = missing_data[missing_data['Missing Count'] > 0].sort_values('Missing Count', ascending=False)
             
             if len(missing_data) > 0:
                 st.write(missing_data)
                 
-                # Visualize missing data
-                fig, ax = plt.subplots(figsize=(12, 6))
-                sns.heatmap(df.isnull(), cbar=False, cmap='viridis', ax=ax)
-                plt.title("Missing Data Heatmap")
-                st.pyplot(fig)
+                # Visualize missing data, binned so render time does not grow with the row count
+                col1, col2 = st.columns(2)
+                with col1:
+                    buckets = st.number_input("Row buckets:", min_value=10, max_value=2000,
+                                              value=DEFAULT_MISSING_BUCKETS, key="missing_buckets")
+                with col2:
+                    missing_order = st.selectbox("Row order:", MISSING_ORDERS, key="missing_order")
+                
+                show_chart("missing_matrix", missing_matrix_figure, df, int(buckets), missing_order)
             else:
                 st.success("✅ No missing values found!")
         
         elif exploration_option == "Duplicates":
             st.subheader("Duplicate Rows Analysis")
-            dup_count = df.duplicated().sum()
+            dup_subset = st.multiselect("Key columns (empty = all columns):", df.columns, key="dup_subset")
+            dup_count = duplicate_index.duplicated_count(df, dup_subset)
             st.info(f"**Total duplicate rows:** {dup_count}")
             
             if dup_count > 0:
-                st.write("**Sample of duplicate rows:**")
-                st.write(df[df.duplicated(keep=False)].sort_values(by=list(df.columns)).head(10))
+                dup_rows, group_count = duplicate_index.groups(df, dup_subset, limit=10)
+                st.write(f"**Sample of duplicate rows** ({group_count:,} group(s)):")
+                show_frame(dup_rows)
         
         elif exploration_option == "Unique Values":
             st.subheader("Unique Values per Column")
@@ -183,24 +527,29 @@ if st.session_state.df is not None:
             with col2:
                 max_unique = st.number_input("Max unique values to show:", min_value=5, value=20)
             
-            unique_vals = df[selected_col].value_counts().head(max_unique)
-            
-            st.write(f"**Unique values in '{selected_col}':** {df[selected_col].nunique()}")
+            if approx:
+                approx_counts = profile.approx_value_counts(df, selected_col, max_unique)
+                unique_vals = approx_counts['count']
+                st.write(f"**Unique values in '{selected_col}':** {approx_unique_text(profile, df, selected_col)}")
+            else:
+                approx_counts = None
+                unique_vals = profile.value_counts(df, selected_col).head(max_unique)
+                st.write(f"**Unique values in '{selected_col}':** {profile.nunique(df, selected_col)}")
             
             col1, col2 = st.columns([1, 1])
             
             with col1:
-                st.write(unique_vals)
+                st.write(unique_vals if approx_counts is None else approx_counts)
             
             with col2:
-                fig, ax = plt.subplots(figsize=(10, 6))
-                unique_vals.plot(kind='barh', ax=ax, color='skyblue')
-                plt.title(f"Top {max_unique} Values in {selected_col}")
-                plt.xlabel("Count")
-                st.pyplot(fig)
+                if len(unique_vals) > 0:
+                    show_chart("top_values", lambda d, col, n, a: top_values_plot(unique_vals, col), df,
+                               selected_col, max_unique, approx)
+                else:
+                    st.caption("No value is frequent enough to be reported by the approximate summary.")
     
     # ============ TAB 3: DATA CLEANING ============
-    with tab3:
+    if section == SECTIONS[2]:
         st.header("Data Cleaning Tools")
         
         cleaning_option = st.selectbox(
@@ -210,6 +559,7 @@ if st.session_state.df is not None:
                 "Show Unique Values",
                 "Replace Missing Values",
                 "Drop Rows with NaN",
+                "Drop Duplicates",
                 "Drop Columns",
                 "Reset to Original"
             ]
@@ -218,25 +568,36 @@ if st.session_state.df is not None:
         if cleaning_option == "Convert Numeric Columns":
             st.subheader("Convert Columns to Numeric")
             
-            object_cols = df.select_dtypes(include=['object']).columns.tolist()
+            object_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
             
             if len(object_cols) > 0:
                 selected_cols = st.multiselect("Select columns to convert to numeric:", object_cols)
                 
+                with st.expander("Units & currency to strip"):
+                    st.caption("Values like `8GB` or `$120` are parsed as the number times the unit's scale "
+                               "(storage sizes default to GB: `1TB` → 1024).")
+                    unit_table = st.data_editor(
+                        pd.DataFrame({'Unit': list(DEFAULT_UNITS), 'Scale': list(DEFAULT_UNITS.values())}),
+                        num_rows="dynamic", key="unit_table"
+                    )
+                    convert_workers = st.slider("Parallel workers:", 1, max(os.cpu_count() or 1, 2),
+                                                min(4, os.cpu_count() or 1), key="convert_workers")
+                
                 if st.button("🔄 Convert Selected Columns"):
-                    for col in selected_cols:
-                        # Remove common units
-                        df[col] = df[col].astype(str).str.replace('GB', '', regex=False)
-                        df[col] = df[col].astype(str).str.replace('kg', '', regex=False)
-                        df[col] = df[col].astype(str).str.replace('GHz', '', regex=False)
-                        df[col] = df[col].astype(str).str.replace('$', '', regex=False)
-                        
-                        # Convert to numeric
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
+                    units = parse_unit_table(unit_table[['Unit', 'Scale']].itertuples(index=False, name=None))
+                    coerced = {}
                     
-                    st.session_state.df = df
+                    def convert(d, cols=list(selected_cols), units=units, workers=convert_workers):
+                        converted, counts = convert_numeric(d, cols, units, max_workers=workers)
+                        coerced.update(counts)
+                        return converted
+                    
+                    df = apply_step(ColumnStep(f"Convert {', '.join(selected_cols)} to numeric", convert, selected_cols))
                     st.success(f"✅ Converted {len(selected_cols)} column(s) to numeric!")
-                    st.write(df[selected_cols].dtypes)
+                    st.write(pd.DataFrame({
+                        'Data Type': df[selected_cols].dtypes.astype(str),
+                        'Coerced to NaN': pd.Series(coerced)
+                    }))
             else:
                 st.info("No object columns found.")
         
@@ -244,15 +605,20 @@ if st.session_state.df is not None:
             st.subheader("Unique Values per Column")
             
             col_for_unique = st.selectbox("Select a column:", df.columns)
-            unique_count = df[col_for_unique].nunique()
-            
-            st.write(f"**Unique values:** {unique_count}")
-            st.write(df[col_for_unique].value_counts())
+            if approx:
+                st.write(f"**Unique values:** {approx_unique_text(profile, df, col_for_unique)}")
+                st.write(profile.approx_value_counts(df, col_for_unique, DEFAULT_HEAVY_HITTERS))
+            else:
+                unique_count = profile.nunique(df, col_for_unique)
+                
+                st.write(f"**Unique values:** {unique_count}")
+                st.write(profile.value_counts(df, col_for_unique))
         
         elif cleaning_option == "Replace Missing Values":
             st.subheader("Handle Missing Values")
             
-            cols_with_missing = df.columns[df.isnull().any()].tolist()
+            null_counts = profile.null_counts(df)
+            cols_with_missing = null_counts[null_counts > 0].index.tolist()
             
             if len(cols_with_missing) > 0:
                 col1, col2 = st.columns(2)
@@ -261,47 +627,23 @@ if st.session_state.df is not None:
                     selected_col = st.selectbox("Select column with missing values:", cols_with_missing)
                 
                 with col2:
-                    fill_method = st.selectbox(
-                        "Fill method:",
-                        ["Mean", "Median", "Mode", "Forward Fill", "Backward Fill", "Custom Value"]
-                    )
+                    fill_method = st.selectbox("Fill method:", FILL_METHODS)
+                
+                custom_val = None
+                if fill_method == "Custom Value":
+                    custom_val = st.text_input("Enter value to fill:")
                 
                 if st.button("🔄 Fill Missing Values"):
-                    if fill_method == "Mean":
-                        if pd.api.types.is_numeric_dtype(df[selected_col]):
-                            df[selected_col].fillna(df[selected_col].mean(), inplace=True)
-                            st.success(f"✅ Filled with mean!")
-                        else:
-                            st.error("Column is not numeric!")
-                    
-                    elif fill_method == "Median":
-                        if pd.api.types.is_numeric_dtype(df[selected_col]):
-                            df[selected_col].fillna(df[selected_col].median(), inplace=True)
-                            st.success(f"✅ Filled with median!")
-                        else:
-                            st.error("Column is not numeric!")
-                    
-                    elif fill_method == "Mode":
-                        mode_val = df[selected_col].mode()[0]
-                        df[selected_col].fillna(mode_val, inplace=True)
-                        st.success(f"✅ Filled with mode: {mode_val}")
-                    
-                    elif fill_method == "Forward Fill":
-                        df[selected_col].fillna(method='ffill', inplace=True)
-                        st.success(f"✅ Applied forward fill!")
-                    
-                    elif fill_method == "Backward Fill":
-                        df[selected_col].fillna(method='bfill', inplace=True)
-                        st.success(f"✅ Applied backward fill!")
-                    
-                    elif fill_method == "Custom Value":
-                        custom_val = st.text_input("Enter value to fill:")
-                        if st.button("Fill with custom value"):
-                            df[selected_col].fillna(custom_val, inplace=True)
-                            st.success(f"✅ Filled with: {custom_val}")
-                    
-                    st.session_state.df = df
-                    st.write(f"Remaining missing values: {df[selected_col].isnull().sum()}")
+                    try:
+                        df = apply_step(FillStep(
+                            f"Fill missing {selected_col} ({fill_method})",
+                            selected_col,
+                            lambda s, method=fill_method, value=custom_val: fill_missing(s, method, value)
+                        ))
+                        st.success(f"✅ Applied {fill_method.lower()} fill!")
+                        st.write(f"Remaining missing values: {profile.null_count(df, selected_col)}")
+                    except (ValueError, TypeError) as e:
+                        st.error(str(e))
             else:
                 st.success("✅ No missing values found!")
         
@@ -324,17 +666,40 @@ if st.session_state.df is not None:
                 rows_before = len(df)
                 
                 if drop_option == "Any value is NaN":
-                    df.dropna(inplace=True)
+                    select = lambda d: missing_rows_mask(d, how='any')
                 elif drop_option == "All values are NaN":
-                    df.dropna(how='all', inplace=True)
-                elif drop_option == "Custom threshold":
-                    df.dropna(thresh=threshold, inplace=True)
+                    select = lambda d: missing_rows_mask(d, how='all')
+                else:
+                    select = lambda d, thresh=threshold: missing_rows_mask(d, thresh=thresh)
                 
+                df = apply_step(RowStep(f"Drop rows ({drop_option})", select))
                 rows_after = len(df)
-                st.session_state.df = df
                 st.success(f"✅ Dropped {rows_before - rows_after} row(s)!")
                 st.info(f"Remaining rows: {rows_after}")
         
+        elif cleaning_option == "Drop Duplicates":
+            st.subheader("Drop Duplicate Rows")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                dedup_subset = st.multiselect("Key columns (empty = all columns):", df.columns, key="dedup_subset")
+            with col2:
+                keep_option = st.radio("Rows to keep:", list(KEEP_OPTIONS), key="dedup_keep")
+            
+            keep = KEEP_OPTIONS[keep_option]
+            st.info(f"Rows to drop: {int(duplicate_index.duplicated(df, dedup_subset, keep).sum()):,}")
+            
+            if st.button("🗑️ Drop Duplicates"):
+                rows_before = len(df)
+                keys = f" on {', '.join(map(str, dedup_subset))}" if dedup_subset else ""
+                df = apply_step(RowStep(
+                    f"Drop duplicates{keys} ({keep_option.lower()})",
+                    lambda d, subset=list(dedup_subset), keep=keep, index=duplicate_index:
+                        index.duplicated(d, subset, keep)
+                ))
+                st.success(f"✅ Dropped {rows_before - len(df)} duplicate row(s)!")
+                st.info(f"Remaining rows: {len(df)}")
+        
         elif cleaning_option == "Drop Columns":
             st.subheader("Drop Columns")
             
@@ -342,19 +707,22 @@ if st.session_state.df is not None:
             
             if st.button("🗑️ Drop Selected Columns"):
                 if len(cols_to_drop) > 0:
-                    df.drop(columns=cols_to_drop, inplace=True)
-                    st.session_state.df = df
+                    df = apply_step(ColumnStep(
+                        f"Drop {', '.join(map(str, cols_to_drop))}",
+                        lambda d, cols=list(cols_to_drop): drop_columns(d, cols),
+                        cols_to_drop
+                    ))
                     st.success(f"✅ Dropped {len(cols_to_drop)} column(s)!")
                 else:
                     st.warning("Please select at least one column!")
         
         elif cleaning_option == "Reset to Original":
             if st.button("🔄 Reset to Original Dataset"):
-                st.session_state.df = st.session_state.df_original.copy()
+                start_dataset(st.session_state.df_original)
                 st.success("✅ Dataset reset to original!")
     
     # ============ TAB 4: CATEGORICAL ENCODING ============
-    with tab4:
+    if section == SECTIONS[3]:
         st.header("Categorical Encoding")
         
         encoding_option = st.selectbox(
@@ -362,7 +730,7 @@ if st.session_state.df is not None:
             ["One-Hot Encoding", "Label Encoding"]
         )
         
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+        categorical_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
         
         if len(categorical_cols) == 0:
             st.warning("No categorical columns found!")
@@ -376,99 +744,109 @@ if st.session_state.df is not None:
                     default=categorical_cols[:1] if len(categorical_cols) > 0 else []
                 )
                 
+                col1, col2 = st.columns(2)
+                with col1:
+                    max_categories = st.number_input("Max categories per column (0 = no limit):", min_value=0,
+                                                     value=0, key="onehot_max_categories",
+                                                     help=f"Rarer values are folded into '{OTHER_LABEL}'")
+                    max_categories = int(max_categories) or None
+                with col2:
+                    st.write("")
+                    sparse_output = st.checkbox("Sparse output", key="onehot_sparse",
+                                                help="Store indicator columns as sparse booleans")
+                
+                if len(selected_cols) > 0:
+                    new_columns, new_bytes = estimate_one_hot(
+                        len(df), profile.nuniques(df, selected_cols).to_dict(),
+                        sparse=sparse_output, max_categories=max_categories
+                    )
+                    st.caption(f"Estimate: replaces {len(selected_cols)} column(s) with {new_columns:,} "
+                               f"indicator columns, ≈{new_bytes / 1024 ** 2:,.1f} MB.")
+                
                 if st.button("🔄 Apply One-Hot Encoding"):
                     if len(selected_cols) > 0:
-                        # Create a copy to avoid SettingWithCopyWarning
-                        df_encoded = df.copy()
-                        
-                        for col in selected_cols:
-                            # One-hot encode
-                            encoded = pd.get_dummies(df_encoded[col], prefix=col, drop_first=False)
-                            df_encoded = pd.concat([df_encoded, encoded], axis=1)
-                            df_encoded.drop(columns=[col], inplace=True)
-                        
-                        st.session_state.df = df_encoded
+                        df_encoded = apply_step(ColumnStep(
+                            f"One-hot encode {', '.join(selected_cols)}",
+                            lambda d, cols=list(selected_cols), sparse=sparse_output, cap=max_categories:
+                                one_hot_encode(d, cols, sparse=sparse, max_categories=cap),
+                            selected_cols
+                        ))
                         st.success(f"✅ Applied one-hot encoding to {len(selected_cols)} column(s)!")
                         st.info(f"New shape: {df_encoded.shape}")
-                        st.write(df_encoded.head())
+                        show_frame(df_encoded.head())
                     else:
                         st.warning("Please select at least one column!")
             
             elif encoding_option == "Label Encoding":
                 st.subheader("Label Encoding")
                 
+                # Code tables kept across uploads so the same labels can be re-applied to a new file
+                if 'label_mappings' not in st.session_state:
+                    st.session_state.label_mappings = {}
+                label_mappings = st.session_state.label_mappings
+                
                 selected_cols = st.multiselect(
                     "Select columns for label encoding:",
                     categorical_cols,
                     default=categorical_cols[:1] if len(categorical_cols) > 0 else []
                 )
                 
+                saved_cols = [col for col in selected_cols if col in label_mappings]
+                reuse_mappings = False
+                if saved_cols:
+                    reuse_mappings = st.checkbox(f"Reuse saved mappings for {', '.join(saved_cols)}", value=True,
+                                                 key="label_reuse",
+                                                 help="Values missing from a saved mapping are labelled -1")
+                
                 if st.button("🔄 Apply Label Encoding"):
                     if len(selected_cols) > 0:
-                        df_encoded = df.copy()
-                        encoder = LabelEncoder()
+                        result = {}
+                        saved = {col: label_mappings[col] for col in saved_cols} if reuse_mappings else {}
                         
-                        for col in selected_cols:
-                            df_encoded[col] = encoder.fit_transform(df_encoded[col].astype(str))
+                        def encode(d, cols=list(selected_cols), saved=saved):
+                            encoded, classes, unseen = label_encode(d, cols, saved)
+                            result.update(classes=classes, unseen=unseen)
+                            return encoded
                         
-                        st.session_state.df = df_encoded
+                        df_encoded = apply_step(ColumnStep(f"Label encode {', '.join(selected_cols)}", encode,
+                                                           selected_cols))
+                        label_mappings.update(result['classes'])
                         st.success(f"✅ Applied label encoding to {len(selected_cols)} column(s)!")
-                        st.write(df_encoded.head())
+                        unseen = {col: count for col, count in result['unseen'].items() if count}
+                        if unseen:
+                            st.warning("Values not in the saved mapping were labelled -1: " +
+                                       ", ".join(f"{col} ({count:,})" for col, count in unseen.items()))
+                        show_frame(df_encoded.head())
                     else:
                         st.warning("Please select at least one column!")
+                
+                with st.expander("💾 Saved Label Mappings"):
+                    if label_mappings:
+                        st.dataframe(pd.DataFrame({
+                            'Column': list(label_mappings),
+                            'Labels': [len(classes) for classes in label_mappings.values()]
+                        }), use_container_width=True, hide_index=True)
+                        st.download_button(
+                            label="📥 Download mappings (JSON)",
+                            data=mappings_to_json(label_mappings),
+                            file_name="label_mappings.json",
+                            mime="application/json"
+                        )
+                        st.button("🗑️ Clear saved mappings", on_click=label_mappings.clear)
+                    else:
+                        st.info("No saved mappings yet. Encoding a column saves its mapping here.")
+                    
+                    mapping_file = st.file_uploader("Load mappings (JSON)", type=['json'], key="label_mapping_file")
+                    if mapping_file is not None and st.button("📂 Load mappings"):
+                        try:
+                            loaded = mappings_from_json(mapping_file.getvalue())
+                        except ValueError as e:
+                            st.error(f"❌ Could not read mappings: {e}")
+                        else:
+                            label_mappings.update(loaded)
+                            st.success(f"✅ Loaded mappings for {len(loaded)} column(s)!")
     
-    # ============ VISUALIZATION FUNCTIONS ============
-    def bar_plot(df, feature):
-        fig, ax = plt.subplots(figsize=(12, 6))
-        sns.countplot(x=feature, data=df, order=df[feature].value_counts().index, palette="Set2", ax=ax)
-        plt.xticks(rotation=90)
-        plt.title(f"Bar Chart of {feature}")
-        st.pyplot(fig)
-    
-    def box_plot(df, category, numeric):
-        fig, ax = plt.subplots(figsize=(15, 7), dpi=150)
-        sns.boxplot(x=df[category], y=df[numeric], palette="Set1", ax=ax)
-        plt.xticks(rotation=90)
-        plt.title(f"Box Plot of {numeric} by {category}")
-        st.pyplot(fig)
-    
-    def histogram(df, feature, bins=30):
-        fig, ax = plt.subplots(figsize=(10, 5))
-        sns.histplot(df[feature], bins=bins, kde=False, color='skyblue', ax=ax)
-        plt.title(f"Histogram of {feature}")
-        plt.xlabel(feature)
-        plt.ylabel("Count")
-        st.pyplot(fig)
-    
-    def kde_plot(df, feature):
-        fig, ax = plt.subplots(figsize=(10, 5))
-        sns.kdeplot(df[feature], shade=True, color='purple', ax=ax)
-        plt.title(f"KDE Plot of {feature}")
-        plt.xlabel(feature)
-        st.pyplot(fig)
-    
-    def stacked_bar(df, cat1, cat2):
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ctab = pd.crosstab(df[cat1], df[cat2])
-        ctab.plot(kind='bar', stacked=True, ax=ax, colormap='Set3')
-        plt.title(f"Stacked Bar Chart: {cat1} vs {cat2}")
-        plt.xticks(rotation=90)
-        plt.ylabel("Count")
-        st.pyplot(fig)
-    
-    def scatter_plot(df, x, y, hue=None):
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.scatterplot(x=df[x], y=df[y], hue=df[hue] if hue else None, ax=ax)
-        plt.title(f"Scatter Plot: {x} vs {y}")
-        st.pyplot(fig)
-    
-    def correlation_heatmap(df):
-        fig, ax = plt.subplots(figsize=(14, 10))
-        corr = df.corr(numeric_only=True)
-        sns.heatmap(corr, annot=True, cmap='coolwarm', linewidths=0.5, ax=ax)
-        plt.title("Correlation Heatmap")
-        st.pyplot(fig)
-    
+    # ============ ANALYSIS TABLES ============
     def frequency_table(df, feature):
         freq = df[feature].value_counts().reset_index()
         freq.columns = [feature, "Count"]
@@ -478,13 +856,48 @@ if st.session_state.df is not None:
         return df[feature].describe()
     
     # ============ TAB 5: VISUALIZATIONS & ANALYSIS ============
-    with tab5:
+    if section == SECTIONS[4]:
         st.header("Visualizations & Statistical Analysis")
         
         st.subheader("📋 Column Names")
         st.write("**Available Columns:**")
         st.write(df.columns.tolist())
         
+        # Charts draw from a cached sample of large frames unless full data is requested
+        if 'sample_cache' not in st.session_state:
+            st.session_state.sample_cache = SampleCache()
+        
+        with st.expander("🎯 Sampling", expanded=len(df) > DEFAULT_SAMPLE_ROWS):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                sample_method = st.selectbox("Sampling method:", SAMPLING_METHODS, key="sample_method")
+            with col2:
+                sample_rows = st.number_input("Sample size (rows):", min_value=1_000,
+                                              value=DEFAULT_SAMPLE_ROWS, step=10_000, key="sample_rows")
+            with col3:
+                sample_seed = st.number_input("Random seed:", min_value=0, value=DEFAULT_SEED, key="sample_seed")
+            
+            stratify_col = None
+            if sample_method == "Stratified":
+                stratify_options = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
+                if stratify_options:
+                    stratify_col = st.selectbox("Stratify by:", stratify_options, key="sample_stratify")
+                else:
+                    st.warning("No categorical columns to stratify by; using a uniform sample.")
+                    sample_method = "Uniform"
+            
+            use_full_data = st.checkbox("Use full data for charts", key="sample_full")
+        
+        if use_full_data or len(df) <= sample_rows:
+            plot_df = df
+            sample_key = None
+        else:
+            sample_spec = (sample_method, int(sample_rows), int(sample_seed), stratify_col)
+            plot_df = st.session_state.sample_cache.get(df, dataset_version(), *sample_spec)
+            sample_key = sample_spec
+            st.caption(f"🎯 Charts use a {sample_method.lower()} sample of {len(plot_df):,} of {len(df):,} rows. "
+                       "Tick **Use full data for charts** in Sampling to plot every row.")
+        
         visualization_option = st.selectbox(
             "Select visualization type:",
             [
@@ -503,18 +916,18 @@ if st.session_state.df is not None:
         
         if visualization_option == "Bar Plot":
             st.subheader("Bar Plot")
-            categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            categorical_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
             if len(categorical_cols) > 0:
                 feature = st.selectbox("Select column:", categorical_cols, key="bar_feature")
                 if st.button("📊 Generate Bar Plot", key="bar_btn"):
-                    bar_plot(df, feature)
+                    show_chart("bar", bar_plot, plot_df, feature, data_key=sample_key)
             else:
                 st.warning("No categorical columns found!")
         
         elif visualization_option == "Box Plot":
             st.subheader("Box Plot")
             col1, col2 = st.columns(2)
-            categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            categorical_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
             
             with col1:
@@ -531,7 +944,7 @@ if st.session_state.df is not None:
             
             if st.button("📊 Generate Box Plot", key="box_btn"):
                 if len(categorical_cols) > 0 and len(numeric_cols) > 0:
-                    box_plot(df, category, numeric)
+                    show_chart("box", box_plot, plot_df, category, numeric, data_key=sample_key)
         
         elif visualization_option == "Histogram":
             st.subheader("Histogram")
@@ -545,7 +958,7 @@ if st.session_state.df is not None:
                     bins = st.slider("Number of bins:", 5, 100, 30)
                 
                 if st.button("📊 Generate Histogram", key="hist_btn"):
-                    histogram(df, feature, bins)
+                    show_chart("histogram", histogram, plot_df, feature, bins, data_key=sample_key)
             else:
                 st.warning("No numeric columns found!")
         
@@ -556,13 +969,13 @@ if st.session_state.df is not None:
             if len(numeric_cols) > 0:
                 feature = st.selectbox("Select numeric column:", numeric_cols, key="kde_feature")
                 if st.button("📊 Generate KDE Plot", key="kde_btn"):
-                    kde_plot(df, feature)
+                    show_chart("kde", kde_plot, plot_df, feature, data_key=sample_key)
             else:
                 st.warning("No numeric columns found!")
         
         elif visualization_option == "Stacked Bar Chart":
             st.subheader("Stacked Bar Chart")
-            categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            categorical_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
             
             if len(categorical_cols) >= 2:
                 col1, col2 = st.columns(2)
@@ -572,14 +985,14 @@ if st.session_state.df is not None:
                     cat2 = st.selectbox("Select second category:", categorical_cols, key="stack_cat2")
                 
                 if st.button("📊 Generate Stacked Bar Chart", key="stack_btn"):
-                    stacked_bar(df, cat1, cat2)
+                    show_chart("stacked_bar", stacked_bar, plot_df, cat1, cat2, data_key=sample_key)
             else:
                 st.warning("Need at least 2 categorical columns!")
         
         elif visualization_option == "Scatter Plot":
             st.subheader("Scatter Plot")
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-            categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            categorical_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
             
             if len(numeric_cols) >= 2:
                 col1, col2, col3 = st.columns(3)
@@ -594,24 +1007,74 @@ if st.session_state.df is not None:
                     else:
                         hue = None
                 
+                col1, col2 = st.columns(2)
+                with col1:
+                    aggregate_above = st.number_input("Aggregate when rows exceed:", min_value=0,
+                                                      value=DEFAULT_SCATTER_THRESHOLD, step=10_000,
+                                                      key="scatter_threshold")
+                with col2:
+                    gridsize = st.slider("Aggregation grid size:", 50, 500, DEFAULT_SCATTER_GRID, key="scatter_grid")
+                
+                # Binning is linear in the rows, so large frames are aggregated in full instead of sampled
+                if len(df) > aggregate_above:
+                    scatter_df, scatter_key = df, None
+                    st.caption(f"{len(df):,} rows: all points are binned into a {gridsize}×{gridsize} grid"
+                               + (" colored by the majority category." if hue else " colored by count."))
+                else:
+                    scatter_df, scatter_key = plot_df, sample_key
+                
                 if st.button("📊 Generate Scatter Plot", key="scatter_btn"):
-                    scatter_plot(df, x, y, hue=hue)
+                    show_chart("scatter", scatter_plot, scatter_df, x, y, hue, int(aggregate_above), gridsize,
+                               data_key=scatter_key)
             else:
                 st.warning("Need at least 2 numeric columns!")
         
         elif visualization_option == "Correlation Heatmap":
             st.subheader("Correlation Heatmap")
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
+            # Bool and sparse indicator columns (e.g. from one-hot encoding) count as numeric, as in df.corr()
+            numeric_cols = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
             
             if len(numeric_cols) > 1:
+                # The matrix over all numeric columns is cached per data version and method
+                if 'correlation_cache' not in st.session_state:
+                    st.session_state.correlation_cache = CorrelationCache()
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    corr_method = st.radio("Method:", CORRELATION_METHODS, horizontal=True, key="corr_method")
+                with col2:
+                    top_k = st.number_input("Strongest pairs to list:", min_value=1, value=DEFAULT_TOP_PAIRS,
+                                            key="corr_top_k")
+                with col3:
+                    st.write("")
+                    cluster = st.checkbox("Cluster similar columns", value=clustering_available(),
+                                          disabled=not clustering_available(), key="corr_cluster",
+                                          help="Requires SciPy" if not clustering_available() else None)
+                heatmap_cols = st.multiselect("Heatmap columns:", numeric_cols,
+                                              default=numeric_cols[:DEFAULT_HEATMAP_COLUMNS], key="corr_columns")
+                
                 if st.button("📊 Generate Correlation Heatmap", key="corr_btn"):
-                    correlation_heatmap(df)
+                    corr = st.session_state.correlation_cache.get(
+                        plot_df, (dataset_version(), sample_key), corr_method, numeric_cols
+                    )
+                    st.write(f"**Top {int(top_k)} strongest pairs** ({len(numeric_cols)} numeric columns):")
+                    st.dataframe(top_pairs(corr, int(top_k)), use_container_width=True, hide_index=True)
+                    
+                    if len(heatmap_cols) > 1:
+                        heatmap = corr.loc[heatmap_cols, heatmap_cols]
+                        if cluster:
+                            order = cluster_order(heatmap)
+                            heatmap = heatmap.loc[order, order]
+                        show_chart("correlation", lambda d, method, *_: correlation_heatmap(heatmap, method), plot_df,
+                                   corr_method, tuple(heatmap_cols), cluster, data_key=sample_key)
+                    else:
+                        st.info("Select at least 2 heatmap columns to draw the heatmap.")
             else:
                 st.warning("Need at least 2 numeric columns for correlation!")
         
         elif visualization_option == "Frequency Table":
             st.subheader("Frequency Table")
-            categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            categorical_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
             
             if len(categorical_cols) > 0:
                 feature = st.selectbox("Select column:", categorical_cols, key="freq_feature")
@@ -632,107 +1095,166 @@ if st.session_state.df is not None:
         elif visualization_option == "Group By Analysis":
             st.subheader("Group By Analysis")
             
-            categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            # Each key's group index is built once and shared by every aggregation on it
+            groupby = st.session_state.groupby_engine
+            if 'groupby_presets' not in st.session_state:
+                st.session_state.groupby_presets = {name: dict(preset) for name, preset in DEFAULT_PRESETS.items()}
+            presets = st.session_state.groupby_presets
+            
+            categorical_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
             
             st.write("**Common Aggregations:**")
             
             if len(categorical_cols) > 0 and len(numeric_cols) > 0:
-                col1, col2 = st.columns(2)
+                col1, col2, col3 = st.columns(3)
                 with col1:
                     group_col = st.selectbox("Group by column:", categorical_cols, key="groupby_col")
                 with col2:
-                    agg_col = st.selectbox("Aggregate column:", numeric_cols, key="groupby_agg")
+                    agg_cols = st.multiselect("Aggregate columns:", numeric_cols, default=numeric_cols[:1],
+                                              key="groupby_agg")
+                with col3:
+                    agg_stats = st.multiselect("Statistics:", AGGREGATIONS, default=["mean"], key="groupby_stats")
                 
                 if st.button("📊 Show Aggregations", key="groupby_btn"):
-                    st.write("---")
-                    
-                    # Average
-                    result = df.groupby(group_col)[agg_col].mean()
-                    st.write(f"**Average {agg_col} per {group_col}:**")
-                    st.write(result)
+                    if agg_cols and agg_stats:
+                        st.write("---")
+                        result = groupby.aggregate(df, group_col, {col: agg_stats for col in agg_cols})
+                        st.write(f"**{', '.join(agg_stats)} of {', '.join(agg_cols)} per {group_col}:**")
+                        st.write(result)
+                    else:
+                        st.warning("Please select at least one column and one statistic!")
+                
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    preset_name = st.text_input("Save this selection as a preset:", key="groupby_preset_name",
+                                                placeholder="e.g. Price per Company")
+                with col2:
                     st.write("")
+                    st.write("")
+                    if st.button("💾 Save Preset", key="groupby_preset_save"):
+                        if preset_name.strip() and agg_cols and agg_stats:
+                            presets[preset_name.strip()] = {
+                                'key': group_col,
+                                'aggregations': {col: list(agg_stats) for col in agg_cols}
+                            }
+                            st.success(f"✅ Saved preset '{preset_name.strip()}'")
+                        else:
+                            st.warning("Enter a name and select columns and statistics first!")
             
-            # Predefined analyses if columns exist
+            # Presets run when all of their columns exist in the current data
             st.write("---")
             st.write("**Predefined Analyses:**")
             
-            if 'Company' in df.columns and 'Price' in df.columns:
-                st.write("**Average Price per Company:**")
-                st.write(df.groupby('Company')['Price'].mean())
-                
-                st.write("**Number of Laptops per Company:**")
-                st.write(df.groupby('Company')['Price'].count())
-            
-            if 'Cpu_Brand' in df.columns and 'Price' in df.columns:
-                st.write("**Average Price per CPU Brand:**")
-                st.write(df.groupby('Cpu_Brand')['Price'].mean())
-            
-            if 'Gpu_Brand' in df.columns and 'Price' in df.columns:
-                st.write("**Average Price per GPU Brand:**")
-                st.write(df.groupby('Gpu_Brand')['Price'].mean())
-            
-            if 'Company' in df.columns and 'Weight' in df.columns:
-                st.write("**Average Weight per Company:**")
-                st.write(df.groupby('Company')['Weight'].mean())
+            skipped_presets = []
+            for name, preset in presets.items():
+                columns = preset_columns(preset)
+                if not all(col in df.columns for col in columns):
+                    continue
+                if not all(pd.api.types.is_numeric_dtype(df[col]) for col in preset['aggregations']):
+                    skipped_presets.append(name)
+                    continue
+                st.write(f"**{name}:**")
+                st.write(groupby.aggregate(df, preset['key'], preset['aggregations']))
+            if skipped_presets:
+                st.caption(f"Skipped until their value columns are numeric: {', '.join(skipped_presets)}")
             
-            if 'Ram' in df.columns and 'Price' in df.columns:
-                st.write("**Average Price per RAM Size:**")
-                st.write(df.groupby('Ram')['Price'].mean())
-            
-            if 'TypeName' in df.columns and 'Price' in df.columns:
-                st.write("**Average Price per Laptop Type:**")
-                st.write(df.groupby('TypeName')['Price'].mean())
-            
-            if 'OpSys' in df.columns and 'Price' in df.columns:
-                st.write("**Number of Laptops per Operating System:**")
-                st.write(df.groupby('OpSys')['Price'].count())
+            with st.expander("⚙️ Manage Presets"):
+                if presets:
+                    st.dataframe(pd.DataFrame({
+                        'Preset': list(presets),
+                        'Group by': [preset['key'] for preset in presets.values()],
+                        'Aggregations': ["; ".join(f"{col}: {', '.join(stats)}" for col, stats in
+                                                   preset['aggregations'].items()) for preset in presets.values()]
+                    }), use_container_width=True, hide_index=True)
+                    to_remove = st.multiselect("Remove presets:", list(presets), key="groupby_preset_remove")
+                    
+                    def remove_presets(names=to_remove):
+                        for name in names:
+                            presets.pop(name, None)
+                        st.session_state.groupby_preset_remove = []
+                    
+                    st.button("🗑️ Remove Selected", key="groupby_preset_remove_btn", on_click=remove_presets)
+                    st.download_button(
+                        label="📥 Download presets (JSON)",
+                        data=presets_to_json(presets),
+                        file_name="groupby_presets.json",
+                        mime="application/json"
+                    )
+                
+                preset_file = st.file_uploader("Load presets (JSON)", type=['json'], key="groupby_preset_file")
+                if preset_file is not None and st.button("📂 Load presets", key="groupby_preset_load"):
+                    try:
+                        loaded = presets_from_json(preset_file.getvalue())
+                    except ValueError as e:
+                        st.error(f"❌ Could not read presets: {e}")
+                    else:
+                        presets.update(loaded)
+                        st.success(f"✅ Loaded {len(loaded)} preset(s)!")
+                
+                def restore_presets():
+                    st.session_state.groupby_presets = {name: dict(preset) for name, preset in DEFAULT_PRESETS.items()}
+                
+                st.button("↩️ Restore default presets", key="groupby_preset_reset", on_click=restore_presets)
     
     # ============ TAB 6: DOWNLOAD ============
-    with tab6:
+    if section == SECTIONS[5]:
         st.header("Download Processed Data")
         
-        col1, col2, col3 = st.columns(3)
+        # Exports are built only on request and cached for the current dataset version
+        if 'export_cache' not in st.session_state:
+            st.session_state.export_cache = ExportCache()
+        export_cache = st.session_state.export_cache
+        current_version = dataset_version()
+        
+        col1, col2 = st.columns(2)
         
-        # CSV download
         with col1:
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download as CSV",
-                data=csv,
-                file_name="processed_data.csv",
-                mime="text/csv"
-            )
+            export_format = st.selectbox("Export format:", available_formats(), key="export_format")
         
-        # Excel download
         with col2:
-            excel_buffer = io.BytesIO()
-            df.to_excel(excel_buffer, index=False, engine='openpyxl')
-            excel_buffer.seek(0)
-            st.download_button(
-                label="📥 Download as Excel",
-                data=excel_buffer,
-                file_name="processed_data.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            st.write("")
+            st.write("")
+            if st.button(f"⚙️ Prepare {export_format}", key="export_btn"):
+                with st.spinner(f"Building {export_format} export..."):
+                    try:
+                        with instrumentation.span(f"export {export_format}", 'export'):
+                            export_cache.build(df, export_format, current_version)
+                    except Exception as e:
+                        st.error(f"Error building {export_format} export: {e}")
         
-        # JSON download
-        with col3:
-            json_data = df.to_json(orient='records', indent=2)
+        prepared = export_cache.get(export_format, current_version)
+        if prepared is not None:
+            data, seconds = prepared
             st.download_button(
-                label="📥 Download as JSON",
-                data=json_data,
-                file_name="processed_data.json",
-                mime="application/json"
+                label=f"📥 Download as {export_format}",
+                data=data,
+                file_name=export_filename(export_format),
+                mime=export_mime(export_format)
             )
+            st.caption(f"{len(data) / 1024 ** 2:,.2f} MB · built in {seconds:.2f}s")
+        else:
+            st.info(f"Click **Prepare {export_format}** to build the file for the current data.")
         
         st.subheader("Data Summary Before Download")
         st.write(f"**Shape:** {df.shape[0]} rows × {df.shape[1]} columns")
-        st.write(f"**Missing values:** {df.isnull().sum().sum()}")
-        st.write(f"**Duplicates:** {df.duplicated().sum()}")
+        st.write(f"**Missing values:** {profile.null_counts(df).sum()}")
+        st.write(f"**Duplicates:** {duplicate_index.duplicated_count(df)}")
         
         st.subheader("Preview")
-        st.write(df.head(10))
+        show_frame(df.head(10))
+    
+    # Timing readout: the other sections were skipped on this rerun
+    instrumentation.end(section_span)
+    section_times = st.session_state.setdefault('section_times', {})
+    section_times[section] = time.perf_counter() - section_start
+    skipped = [name for name in section_times if name != section]
+    saved = sum(section_times[name] for name in skipped)
+    st.sidebar.caption(
+        f"⏱️ Section rendered in {section_times[section] * 1000:,.0f} ms · "
+        f"skipped {len(SECTIONS) - 1} section(s)"
+        + (f" (≈{saved * 1000:,.0f} ms saved, from last measured runs)" if skipped else "")
+    )
 
 else:
     st.info("👈 Upload a CSV file to get started!")
@@ -745,3 +1267,77 @@ else:
     - 🏷️ Categorical encoding (One-Hot & Label)
     - 📥 Download processed data in multiple formats
     """)
+
+# Rerun record: shown in the developer panel and appended to the profile log
+trace = instrumentation.end_rerun()
+rerun_record = trace.to_record(section=st.session_state.get('section'),
+                               rows=None if st.session_state.df is None else len(st.session_state.df))
+st.session_state.rerun_log.append(rerun_record)
+if get_profile_log() is not None:
+    get_profile_log().write(rerun_record)
+
+if st.sidebar.checkbox("🛠️ Developer panel", key="dev_panel"):
+    with st.sidebar.expander("🛠️ Rerun Profile", expanded=True):
+        rss = rerun_record['rss_bytes']
+        peak = rerun_record['peak_rss_bytes']
+        st.caption(f"Rerun #{rerun_record['rerun']} · {rerun_record['seconds'] * 1000:,.0f} ms"
+                   + (f" · RSS {rss / 1024 ** 2:,.0f} MB" if rss else "")
+                   + (f" · peak RSS {peak / 1024 ** 2:,.0f} MB" if peak else ""))
+        if rss is None:
+            st.caption("Current memory is not readable on this system (install psutil), so RSS Δ is not shown.")
+        st.write(pd.DataFrame({
+            'Part': ["  " * span['depth'] + span['name'] for span in rerun_record['spans']],
+            'Kind': [span['kind'] for span in rerun_record['spans']],
+            'ms': [round(span.get('seconds', float('nan')) * 1000, 1) for span in rerun_record['spans']],
+            'RSS Δ MB': [round(span['rss_delta'] / 1024 ** 2, 1) if span.get('rss_delta') is not None else None
+                         for span in rerun_record['spans']],
+            'Cached': [span.get('cached') for span in rerun_record['spans']],
+        }))
+        st.write(pd.DataFrame({'Count': [rerun_record['counters'].get(name, 0) for name in COUNTERS]},
+                              index=list(COUNTERS.values())))
+        
+        st.write("**Recent reruns:**")
+        recent = list(st.session_state.rerun_log)
+        st.write(pd.DataFrame({
+            'Rerun': [r['rerun'] for r in recent],
+            'Section': [r['section'] for r in recent],
+            'ms': [round(r['seconds'] * 1000, 1) for r in recent],
+            **{label: [r['counters'].get(name, 0) for r in recent] for name, label in COUNTERS.items()},
+        }).iloc[::-1])
+        st.download_button("📥 Download session log (JSONL)",
+                           "".join(json.dumps(r, default=str) + "\n" for r in recent).encode('utf-8'),
+                           file_name=f"rerun_profile_{st.session_state.session_id}.jsonl",
+                           mime="application/x-ndjson", key="dev_log_download")
+        if get_profile_log() is None:
+            st.caption("Set EDA_PROFILE_LOG=/path/to/log.jsonl to log every rerun of every session.")
+    
+    with st.sidebar.expander("🗄️ Shared Datasets"):
+        store = get_dataset_store()
+        store_stats = store.stats()
+        if not isinstance(store, DatasetStore):
+            st.caption(f"In-memory cache (install pyarrow for the memory-mapped store) · "
+                       f"{store_stats['entries']} dataset(s) · {store_stats['bytes'] / 1024 ** 2:,.0f} MB")
+        else:
+            st.caption(f"{store_stats['entries']} dataset(s), {store_stats['open']} open, "
+                       f"{store_stats['in_use']} in use · hits {store_stats['hits']:,} · "
+                       f"evictions {store_stats['evictions']:,}")
+            st.write(pd.DataFrame({
+                'Used MB': [store_stats['bytes'] / 1024 ** 2, store_stats['file_bytes'] / 1024 ** 2,
+                            store_stats['mapped_bytes'] / 1024 ** 2],
+                'Budget MB': [store_stats['max_bytes'] / 1024 ** 2, store_stats['max_file_bytes'] / 1024 ** 2, None],
+            }, index=["In memory", "On disk", "Memory-mapped"]).round(1))
+            usage = store.usage()
+            st.write(pd.DataFrame({
+                # Content hash prefix plus the load-options suffix
+                'Dataset': (usage['key'].str[:8] + usage['key'].str[32:]
+                            + np.where(usage['key'] == st.session_state.dataset_key, " (this)", "")),
+                'State': usage['state'],
+                'Sessions': usage['sessions'],
+                'Rows': usage['rows'],
+                'In memory MB': (usage['memory_bytes'] / 1024 ** 2).round(1),
+                'Mapped MB': (usage['mapped_bytes'] / 1024 ** 2).round(1),
+                'File MB': (usage['file_bytes'] / 1024 ** 2).round(1),
+                'Idle s': (time.time() - usage['last_used']).round(0),
+            }))
+            st.caption(f"Files in {store.directory}. Idle datasets are closed when the memory budget is exceeded "
+                       "and deleted when the disk budget is exceeded.")
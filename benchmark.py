@@ -0,0 +1,284 @@
+"""
+Benchmark Suite
+Times ingestion, overview metrics, each cleaning and encoding operation,
+each chart and each export format on synthetic datasets of several sizes,
+and reports time and peak memory. Results can be saved as a baseline and
+later runs compared against it to flag regressions.
+
+Usage:
+    python benchmark.py --sizes 10000 100000 1000000 --save-baseline baseline.json
+    python benchmark.py --sizes 10000 100000 1000000 --baseline baseline.json
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+from charts import (bar_plot, box_plot, correlation_heatmap, histogram, kde_plot, missing_matrix_figure,
+                    scatter_plot, stacked_bar, top_values_plot)
+from cleaning import convert_numeric, drop_columns, fill_missing, missing_rows_mask
+from correlation import correlation_matrix
+from duplicates import DuplicateIndex
+from encoding import label_encode, one_hot_encode
+from exporting import EXCEL_MAX_ROWS, available_formats, export_bytes
+from figure_cache import render_figure
+from generate_sample_data import generate_frame
+from grouping import GroupByEngine
+from ingestion import FrameCache, load_csv
+from profiling import ColumnProfileCache, ColumnVersions
+from sampling import DEFAULT_SAMPLE_ROWS, uniform_sample
+
+warnings.filterwarnings('ignore')
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+# A run is flagged when it is this much slower (or uses this much more memory) than the baseline
+DEFAULT_THRESHOLD = 0.25
+
+# Differences below these are treated as noise
+MIN_SECONDS = 0.01
+MIN_BYTES = 1024 ** 2
+
+# Excel export is only benchmarked up to this many rows (it is by far the slowest format)
+DEFAULT_EXCEL_MAX_ROWS = 100_000
+
+# Libraries the app should only import once a chart, encoder or clustered heatmap is used
+LAZY_MODULES = ['matplotlib.pyplot', 'seaborn', 'scipy', 'sklearn', 'openpyxl']
+
+# Run in a fresh interpreter: time to the first rendered page of the app, then a warm rerun
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+app.run()
+first = time.perf_counter()
+app.run()
+rerun = time.perf_counter()
+from ingestion import peak_memory_bytes  # already imported by the app
+print(json.dumps({
+    'streamlit import': imported - start,
+    'first render': first - imported,
+    'rerun': rerun - first,
+    'peak_bytes': peak_memory_bytes(),
+    'loaded': [name for name in sys.argv[2:] if name in sys.modules],
+    'errors': [str(e) for e in app.exception],
+}))
+"""
+
+
+def _profile():
+    return ColumnProfileCache(ColumnVersions())
+
+
+def _chart(build):
+    return lambda data: render_figure(build(data['sample']))
+
+
+def _export(fmt):
+    return lambda data: export_bytes(data['clean'], fmt)
+
+
+# (group, name, function(data)); ``data`` holds the CSV bytes and the parsed,
+# converted and sampled frames for one size
+BENCHMARKS = [
+    ('ingestion', 'read_csv (c)', lambda data: load_csv(data['csv'], FrameCache())),
+    ('ingestion', 'read_csv (pyarrow)', lambda data: load_csv(data['csv'], FrameCache(), {'engine': 'pyarrow'})),
+    ('ingestion', 'read_csv + compact', lambda data: load_csv(data['csv'], FrameCache(), compact=True)),
+    ('overview', 'missing values', lambda data: _profile().null_counts(data['raw']).sum()),
+    ('overview', 'duplicates', lambda data: DuplicateIndex(ColumnVersions()).duplicated_count(data['raw'])),
+    ('overview', 'describe', lambda data: _profile().describe(data['raw'])),
+    ('overview', 'approximate describe', lambda data: _profile().approx_describe(data['raw'])),
+    ('cleaning', 'convert numeric', lambda data: convert_numeric(data['raw'], ['Ram', 'Weight'])),
+    ('cleaning', 'fill missing (median)', lambda data: fill_missing(data['clean']['Price'], 'Median')),
+    ('cleaning', 'fill missing (mode)', lambda data: fill_missing(data['clean']['Ram'], 'Mode')),
+    ('cleaning', 'drop rows with NaN', lambda data: data['raw'][~missing_rows_mask(data['raw'])]),
+    ('cleaning', 'drop duplicates', lambda data: data['raw'][
+        ~DuplicateIndex(ColumnVersions()).duplicated(data['raw'])]),
+    ('cleaning', 'drop columns', lambda data: drop_columns(data['raw'], ['Gpu', 'Cpu'])),
+    ('encoding', 'one-hot', lambda data: one_hot_encode(data['raw'], ['Company', 'TypeName', 'OpSys'])),
+    ('encoding', 'one-hot (sparse)', lambda data: one_hot_encode(data['raw'], ['Company', 'TypeName', 'OpSys'],
+                                                                 sparse=True)),
+    ('encoding', 'label', lambda data: label_encode(data['raw'], ['Company', 'TypeName', 'Cpu', 'Gpu'])),
+    ('analysis', 'group by', lambda data: GroupByEngine(ColumnVersions()).aggregate(
+        data['clean'], 'Company', {'Price': ['mean', 'count', 'median', 'p90'], 'Weight': ['mean']})),
+    ('analysis', 'correlation', lambda data: correlation_matrix(
+        data['clean'], ['Inches', 'Ram', 'Weight', 'Price'])),
+    ('charts', 'bar', _chart(lambda df: bar_plot(df, 'Company'))),
+    ('charts', 'box', _chart(lambda df: box_plot(df, 'Company', 'Price'))),
+    ('charts', 'histogram', _chart(lambda df: histogram(df, 'Price'))),
+    ('charts', 'kde', _chart(lambda df: kde_plot(df, 'Price'))),
+    ('charts', 'stacked bar', _chart(lambda df: stacked_bar(df, 'Company', 'TypeName'))),
+    ('charts', 'scatter', _chart(lambda df: scatter_plot(df, 'Inches', 'Price', 'Company'))),
+    ('charts', 'missing matrix', _chart(missing_matrix_figure)),
+    ('charts', 'top values', _chart(lambda df: top_values_plot(df['Cpu'].value_counts().head(20), 'Cpu'))),
+    ('charts', 'correlation heatmap', _chart(lambda df: correlation_heatmap(
+        correlation_matrix(df, ['Inches', 'Ram', 'Weight', 'Price'])))),
+] + [('export', fmt, _export(fmt)) for fmt in available_formats()]
+
+
+def prepare(rows, seed=0):
+    """The inputs every benchmark of one size reads."""
+    raw = generate_frame(rows, np.random.default_rng(seed))
+    csv = raw.to_csv(index=False).encode('utf-8')
+    clean, _ = convert_numeric(raw, ['Ram', 'Weight'])
+    # Charts draw from the same kind of sample as the app does
+    sample = uniform_sample(clean, DEFAULT_SAMPLE_ROWS)
+    return {'csv': csv, 'raw': raw, 'clean': clean, 'sample': sample}
+
+
+def measure(function, data, repeat=1, memory=True):
+    """``(seconds, peak_bytes)``: best time of ``repeat`` runs and the peak traced memory of one more."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(data)
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        # Traced separately: tracemalloc slows allocation-heavy code down
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function(data)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes, selected=None, repeat=1, memory=True, excel_max_rows=DEFAULT_EXCEL_MAX_ROWS):
+    """Yield one result dict per (size, benchmark)."""
+    for rows in sizes:
+        data = prepare(rows)
+        for group, name, function in BENCHMARKS:
+            if selected and group not in selected:
+                continue
+            if group == 'export' and name == 'Excel' and len(data['clean']) > min(excel_max_rows, EXCEL_MAX_ROWS - 1):
+                continue
+            seconds, peak = measure(function, data, repeat, memory)
+            yield {'rows': rows, 'group': group, 'name': name, 'seconds': seconds, 'peak_bytes': peak}
+
+
+def measure_startup(repeat=1):
+    """Cold-start timings of the app in fresh interpreters (best of ``repeat``), and the lazy modules it loaded."""
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, app, *LAZY_MODULES], capture_output=True,
+                                text=True, check=True, cwd=os.path.dirname(app)).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        if timings['errors']:
+            raise RuntimeError(f"App failed to start: {timings['errors'][0]}")
+        if best is None or timings['first render'] < best['first render']:
+            best = timings
+    return best
+
+
+def run_startup(repeat=1):
+    """Yield the startup results (rows 0, group ``startup``)."""
+    timings = measure_startup(repeat)
+    for name in ['streamlit import', 'first render', 'rerun']:
+        yield {'rows': 0, 'group': 'startup', 'name': name, 'seconds': timings[name],
+               'peak_bytes': timings['peak_bytes'] if name == 'first render' else None,
+               'loaded': timings['loaded']}
+
+
+def result_key(result):
+    return f"{result['rows']}/{result['group']}/{result['name']}"
+
+
+def compare(result, baseline, threshold=DEFAULT_THRESHOLD):
+    """Regressions of ``result`` against its baseline entry, as short strings."""
+    base = baseline.get(result_key(result))
+    if base is None:
+        return []
+    flags = []
+    if (result['seconds'] > base['seconds'] * (1 + threshold)
+            and result['seconds'] - base['seconds'] > MIN_SECONDS):
+        flags.append(f"time +{result['seconds'] / base['seconds'] - 1:.0%}")
+    if (result['peak_bytes'] is not None and base.get('peak_bytes')
+            and result['peak_bytes'] > base['peak_bytes'] * (1 + threshold)
+            and result['peak_bytes'] - base['peak_bytes'] > MIN_BYTES):
+        flags.append(f"memory +{result['peak_bytes'] / base['peak_bytes'] - 1:.0%}")
+    return flags
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return {result_key(result): result for result in json.load(f)['results']}
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app's data operations.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="dataset rows to benchmark")
+    parser.add_argument('--groups', nargs='+', choices=sorted({group for group, _, _ in BENCHMARKS} | {'startup'}),
+                        help="only run these benchmark groups (startup: time to first render of the app)")
+    parser.add_argument('--repeat', type=int, default=1, help="timed runs per benchmark (the best is kept)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced peak-memory run")
+    parser.add_argument('--excel-max-rows', type=int, default=DEFAULT_EXCEL_MAX_ROWS)
+    parser.add_argument('--baseline', help="compare against this results file and flag regressions")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown or memory growth flagged as a regression (default 0.25)")
+    parser.add_argument('--save-baseline', metavar='PATH', help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+    results, regressions = [], 0
+    print(f"{'rows':>10}  {'group':<10} {'benchmark':<24} {'seconds':>9} {'peak MB':>9}  vs baseline")
+    groups = [group for group in args.groups or [] if group != 'startup']
+    suites = []
+    if not args.groups or 'startup' in args.groups:
+        suites.append(run_startup(args.repeat))
+    if not args.groups or groups:
+        suites.append(run(args.sizes, groups or None, args.repeat, not args.no_memory, args.excel_max_rows))
+    for result in itertools.chain.from_iterable(suites):
+        results.append(result)
+        flags = compare(result, baseline, args.threshold)
+        regressions += bool(flags)
+        base = baseline.get(result_key(result))
+        change = f"{result['seconds'] / base['seconds'] - 1:+.0%}" if base and base['seconds'] else ""
+        peak = f"{result['peak_bytes'] / 1024 ** 2:9.1f}" if result['peak_bytes'] is not None else f"{'-':>9}"
+        print(f"{result['rows']:>10,}  {result['group']:<10} {result['name']:<24} {result['seconds']:9.3f} {peak}  "
+              f"{change}{'  REGRESSION: ' + ', '.join(flags) if flags else ''}", flush=True)
+        if result['group'] == 'startup' and result['name'] == 'first render' and result['loaded']:
+            print(f"{'':>12}loaded at startup: {', '.join(result['loaded'])}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"Saved {len(results)} results to {args.save_baseline}")
+    if baseline:
+        print(f"{regressions} regression(s) over {args.threshold:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Chart Builders for the Streamlit App
+Functions here return matplotlib figures; the app decides how to show them.
+Matplotlib and seaborn are imported inside the chart functions, so they
+load on the first chart rather than when the app starts.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Row buckets in the missing-value matrix
+DEFAULT_MISSING_BUCKETS = 200
+
+MISSING_ORDERS = ["Original order", "Sort by missing count", "Cluster by pattern"]
+
+# Scatter plots with more rows than this are drawn as an aggregated raster
+DEFAULT_SCATTER_THRESHOLD = 100_000
+DEFAULT_SCATTER_GRID = 200
+
+# Correlation heatmaps with more columns than this are drawn without cell labels
+MAX_ANNOTATED_COLUMNS = 20
+
+
+def _row_order(mask_columns, order):
+    """Row permutation for the requested missingness ordering, or None."""
+    if order == "Sort by missing count":
+        missing_per_row = np.sum(mask_columns, axis=0, dtype=np.int64)
+        return np.argsort(missing_per_row, kind='stable')
+    if order == "Cluster by pattern":
+        # Identical missingness patterns end up adjacent, most common first
+        packed = np.packbits(np.vstack(mask_columns).T, axis=1)
+        if packed.shape[1] <= 8:
+            # Up to 64 columns: one uint64 per row sorts much faster than raw bytes
+            padded = np.zeros((packed.shape[0], 8), dtype=np.uint8)
+            padded[:, :packed.shape[1]] = packed
+            keys = padded.view(np.uint64).ravel()
+        else:
+            packed = np.ascontiguousarray(packed)
+            keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        return np.lexsort((inverse, -counts[inverse]))
+    return None
+
+
+def missing_matrix(df, buckets=DEFAULT_MISSING_BUCKETS, order="Original order"):
+    """Missing fraction per (row bucket, column).
+
+    Rows are split into at most ``buckets`` contiguous buckets, so the
+    result has a fixed size however many rows ``df`` has. Returns
+    ``(fractions, columns, bucket_starts)``.
+    """
+    n_rows = len(df)
+    columns = list(df.columns)
+    if n_rows == 0 or not columns:
+        return np.zeros((0, len(columns))), columns, np.zeros(0, dtype=np.int64)
+
+    masks = [df[col].isna().to_numpy() for col in columns]
+    permutation = _row_order(masks, order)
+    if permutation is not None:
+        masks = [mask[permutation] for mask in masks]
+
+    n_buckets = min(buckets, n_rows)
+    starts = np.linspace(0, n_rows, n_buckets, endpoint=False).astype(np.int64)
+    sizes = np.diff(np.append(starts, n_rows))
+    fractions = np.column_stack([
+        np.add.reduceat(mask, starts, dtype=np.int64) / sizes for mask in masks
+    ])
+
+    if order == "Cluster by pattern":
+        column_order = np.argsort(-fractions.mean(axis=0), kind='stable')
+        fractions = fractions[:, column_order]
+        columns = [columns[i] for i in column_order]
+    return fractions, columns, starts
+
+
+def missing_matrix_figure(df, buckets=DEFAULT_MISSING_BUCKETS, order="Original order"):
+    """Render the binned missing-value matrix as a compact image."""
+    import matplotlib.pyplot as plt
+
+    fractions, columns, starts = missing_matrix(df, buckets, order)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    image = ax.imshow(fractions, aspect='auto', interpolation='nearest', cmap='viridis', vmin=0, vmax=1)
+    ax.set_xticks(range(len(columns)))
+    ax.set_xticklabels(columns, rotation=90)
+
+    # Label a handful of buckets with the first row they contain
+    if len(starts) > 0:
+        ticks = np.unique(np.linspace(0, len(starts) - 1, min(len(starts), 10)).astype(int))
+        ax.set_yticks(ticks)
+        ax.set_yticklabels([f"{starts[i]:,}" for i in ticks])
+    ax.set_ylabel("Row" if order == "Original order" else f"Row ({order.lower()})")
+    fig.colorbar(image, ax=ax, label="Missing fraction")
+    ax.set_title(f"Missing Data Matrix ({len(df):,} rows in {len(starts)} buckets)")
+    fig.tight_layout()
+    return fig
+
+
+def bar_plot(df, feature):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.countplot(x=feature, data=df, order=df[feature].value_counts().index, palette="Set2", ax=ax)
+    ax.tick_params(axis='x', rotation=90)
+    ax.set_title(f"Bar Chart of {feature}")
+    return fig
+
+
+def box_plot(df, category, numeric):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(15, 7), dpi=150)
+    sns.boxplot(x=df[category], y=df[numeric], palette="Set1", ax=ax)
+    ax.tick_params(axis='x', rotation=90)
+    ax.set_title(f"Box Plot of {numeric} by {category}")
+    return fig
+
+
+def histogram(df, feature, bins=30):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    sns.histplot(df[feature], bins=bins, kde=False, color='skyblue', ax=ax)
+    ax.set_title(f"Histogram of {feature}")
+    ax.set_xlabel(feature)
+    ax.set_ylabel("Count")
+    return fig
+
+
+def kde_plot(df, feature):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    sns.kdeplot(df[feature], fill=True, color='purple', ax=ax)
+    ax.set_title(f"KDE Plot of {feature}")
+    ax.set_xlabel(feature)
+    return fig
+
+
+def stacked_bar(df, cat1, cat2):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ctab = pd.crosstab(df[cat1], df[cat2])
+    ctab.plot(kind='bar', stacked=True, ax=ax, colormap='Set3')
+    ax.set_title(f"Stacked Bar Chart: {cat1} vs {cat2}")
+    ax.tick_params(axis='x', rotation=90)
+    ax.set_ylabel("Count")
+    return fig
+
+
+def _grid_cells(values, bins):
+    """Bin index of each value on an even grid over its range, and the edges."""
+    low, high = float(np.min(values)), float(np.max(values))
+    if high <= low:
+        high = low + 1.0
+    cells = ((values - low) * (bins / (high - low))).astype(np.int64)
+    return np.clip(cells, 0, bins - 1), (low, high)
+
+
+def aggregated_scatter(df, x, y, hue=None, gridsize=DEFAULT_SCATTER_GRID):
+    """Scatter drawn as a raster of binned points.
+
+    Points are binned onto a ``gridsize`` x ``gridsize`` grid. Without
+    ``hue`` each cell shows its point count on a log scale; with ``hue``
+    it shows the most common category among its points.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from matplotlib.colors import ListedColormap, LogNorm
+    from matplotlib.patches import Patch
+
+    # x, y and hue may name the same column (the X and Y selectors start on the same one)
+    columns = list(dict.fromkeys([x, y] + ([hue] if hue else [])))
+    data = df[columns].dropna()
+    xs = data[x].to_numpy(dtype=np.float64)
+    ys = data[y].to_numpy(dtype=np.float64)
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.set_title(f"Scatter Plot: {x} vs {y} ({len(data):,} points, aggregated)")
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    if len(data) == 0:
+        return fig
+
+    x_cells, (x_low, x_high) = _grid_cells(xs, gridsize)
+    y_cells, (y_low, y_high) = _grid_cells(ys, gridsize)
+    cells = y_cells * gridsize + x_cells
+    extent = (x_low, x_high, y_low, y_high)
+
+    if not hue:
+        counts = np.bincount(cells, minlength=gridsize * gridsize).reshape(gridsize, gridsize)
+        image = ax.imshow(np.ma.masked_equal(counts, 0), origin='lower', extent=extent, aspect='auto',
+                          interpolation='nearest', cmap='viridis', norm=LogNorm())
+        fig.colorbar(image, ax=ax, label="Points per cell")
+        return fig
+
+    # Count points per (cell, category) and keep the majority category per cell
+    codes, categories = pd.factorize(data[hue], sort=True)
+    n_categories = len(categories)
+    counts = np.bincount(cells * n_categories + codes, minlength=gridsize * gridsize * n_categories)
+    counts = counts.reshape(gridsize * gridsize, n_categories)
+    majority = np.ma.masked_array(counts.argmax(axis=1), mask=counts.sum(axis=1) == 0)
+
+    palette = ListedColormap(sns.color_palette(n_colors=n_categories))
+    ax.imshow(majority.reshape(gridsize, gridsize), origin='lower', extent=extent, aspect='auto',
+              interpolation='nearest', cmap=palette, vmin=-0.5, vmax=n_categories - 0.5)
+    handles = [Patch(color=palette(i), label=str(category)) for i, category in enumerate(categories)]
+    ax.legend(handles=handles, title=f"{hue} (majority)", loc='best')
+    return fig
+
+
+def scatter_plot(df, x, y, hue=None, aggregate_above=DEFAULT_SCATTER_THRESHOLD, gridsize=DEFAULT_SCATTER_GRID):
+    """Point scatter, switching to ``aggregated_scatter`` above ``aggregate_above`` rows."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if aggregate_above is not None and len(df) > aggregate_above:
+        return aggregated_scatter(df, x, y, hue=hue, gridsize=gridsize)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.scatterplot(x=df[x], y=df[y], hue=df[hue] if hue else None, ax=ax)
+    ax.set_title(f"Scatter Plot: {x} vs {y}")
+    return fig
+
+
+def correlation_heatmap(corr, method="Pearson"):
+    """Heatmap of a precomputed correlation matrix, annotated when it is small."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    small = len(corr) <= MAX_ANNOTATED_COLUMNS
+    fig, ax = plt.subplots(figsize=(14, 10))
+    sns.heatmap(corr, annot=small, fmt='.2f', cmap='coolwarm', vmin=-1, vmax=1,
+                linewidths=0.5 if small else 0, ax=ax)
+    ax.set_title(f"{method} Correlation Heatmap ({len(corr)} columns)")
+    return fig
+
+
+def top_values_plot(values, column):
+    """Horizontal bar chart of a value_counts() result."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    values.plot(kind='barh', ax=ax, color='skyblue')
+    ax.set_title(f"Top {len(values)} Values in {column}")
+    ax.set_xlabel("Count")
+    return fig
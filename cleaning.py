@@ -0,0 +1,171 @@
+"""
+Data Cleaning Operations
+Pure functions behind the Data Cleaning section. They return new
+DataFrames (or Series) and leave their input unchanged.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Units and currency symbols stripped by convert_numeric, with the factor
+# applied to the number (storage sizes are scaled to GB)
+DEFAULT_UNITS = {
+    'TB': 1024.0,
+    'GB': 1.0,
+    'MB': 1 / 1024,
+    'kg': 1.0,
+    'GHz': 1.0,
+    '$': 1.0,
+}
+
+FILL_METHODS = ["Mean", "Median", "Mode", "Forward Fill", "Backward Fill", "Custom Value"]
+
+
+def build_unit_pattern(units):
+    """Compile one regex matching a number with an optional unit or currency.
+
+    The unit may come before the number (``$120``) or after it (``8GB``);
+    longer units are tried first so ``GHz`` wins over a shorter prefix.
+    """
+    alternatives = '|'.join(re.escape(unit) for unit in sorted(units, key=len, reverse=True))
+    # [^\s\S] never matches, in Python's re and in Arrow's RE2
+    unit = f'(?:{alternatives})' if alternatives else r'[^\s\S]'
+    return re.compile(
+        rf'^\s*(?P<prefix>{unit})?\s*'
+        r'(?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+        rf'\s*(?P<suffix>{unit})?\s*$'
+    )
+
+
+def parse_unit_table(rows):
+    """Build a ``{unit: scale}`` table from (unit, scale) pairs, skipping blanks."""
+    units = {}
+    for unit, scale in rows:
+        if unit is None or pd.isna(unit) or str(unit).strip() == '':
+            continue
+        units[str(unit).strip()] = 1.0 if scale is None or pd.isna(scale) else float(scale)
+    return units
+
+
+def _parse_texts(texts, pattern, units):
+    """Numbers (NaN where ``pattern`` does not match) of the texts, scaled by their unit.
+
+    Uses Arrow's vectorized RE2 matcher when available, and pandas'
+    ``str.extract`` otherwise.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        pa = None
+    if pa is not None:
+        try:
+            parts = pc.extract_regex(pa.array(texts, type=pa.string()), pattern.pattern)
+        except pa.ArrowInvalid:  # not valid RE2 (e.g. an unusual unit), fall back to Python's re
+            pass
+        else:
+            # flatten() applies the struct's validity, so non-matching rows come out null
+            prefix, number, suffix = (parts.flatten()[parts.type.get_field_index(name)]
+                                      for name in ('prefix', 'number', 'suffix'))
+            # RE2 reports an unmatched optional group as an empty string
+            unit = pc.if_else(pc.equal(prefix, ''), suffix, prefix)
+            scale = pc.take(pa.array(list(units.values()) + [1.0], type=pa.float64()),
+                            pc.fill_null(pc.index_in(unit, value_set=pa.array(list(units), type=pa.string())),
+                                         len(units)))
+            values = pc.multiply(pc.cast(number, pa.float64()), scale)
+            return values.to_numpy(zero_copy_only=False, writable=True)
+
+    parts = pd.Series(texts, dtype=object).str.extract(pattern)
+    unit = parts['prefix'].fillna(parts['suffix'])
+    scale = unit.map(units).fillna(1.0).to_numpy(dtype=np.float64)
+    return pd.to_numeric(parts['number']).to_numpy(dtype=np.float64) * scale
+
+
+def to_numeric_with_units(series, units=None, pattern=None):
+    """Convert a column of values like ``8GB`` or ``$120`` to numbers.
+
+    Values are multiplied by their unit's scale, so with the default table
+    ``1TB`` becomes ``1024`` (GB). The regex runs once, vectorized, over
+    the distinct values rather than once per row per unit. Returns
+    ``(numbers, coerced)`` where ``coerced`` counts non-missing values that
+    could not be parsed.
+    """
+    units = DEFAULT_UNITS if units is None else units
+    pattern = pattern or build_unit_pattern(units)
+
+    codes, uniques = pd.factorize(series)
+    uniques = np.asarray(uniques)
+    if uniques.dtype.kind in 'iuf':
+        parsed = uniques.astype(np.float64)
+    else:
+        uniques = uniques.astype(object)
+        if pd.api.types.infer_dtype(uniques, skipna=False) == 'string':
+            parsed = _parse_texts(uniques, pattern, units)
+        else:
+            # Numbers in a mixed object column are kept as they are; everything else is parsed as text
+            numbers = np.fromiter((isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+                                   for value in uniques), dtype=bool, count=len(uniques))
+            parsed = _parse_texts([str(value) for value in uniques], pattern, units)
+            parsed[numbers] = uniques[numbers].astype(np.float64)
+
+    # Code -1 marks missing input; index into an extra trailing NaN for it
+    values = np.append(parsed, np.nan)[codes]
+    coerced = int(np.count_nonzero(np.isnan(values) & (codes >= 0)))
+    return pd.Series(values, index=series.index, name=series.name), coerced
+
+
+def convert_numeric(df, columns, units=None, max_workers=None):
+    """Strip units/currency from columns and convert them to numbers.
+
+    Columns are converted concurrently on a thread pool. Returns
+    ``(new_df, coerced)`` with the per-column count of values that became
+    NaN because they could not be parsed.
+    """
+    units = DEFAULT_UNITS if units is None else units
+    pattern = build_unit_pattern(units)
+    columns = list(columns)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(lambda col: to_numeric_with_units(df[col], units, pattern), columns))
+
+    out = df.copy(deep=False)
+    coerced = {}
+    for col, (values, count) in zip(columns, results):
+        out[col] = values
+        coerced[col] = count
+    return out, coerced
+
+
+def fill_missing(series, method, value=None):
+    """Return ``series`` with missing values filled using ``method``."""
+    if method in ("Mean", "Median"):
+        if not pd.api.types.is_numeric_dtype(series):
+            raise ValueError("Column is not numeric!")
+        fill = series.mean() if method == "Mean" else series.median()
+        return series.fillna(fill)
+    if method == "Mode":
+        return series.fillna(series.mode()[0])
+    if method == "Forward Fill":
+        return series.ffill()
+    if method == "Backward Fill":
+        return series.bfill()
+    if method == "Custom Value":
+        # Compacted text columns are categorical and only accept values that are categories
+        if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+            series = series.cat.add_categories([value])
+        return series.fillna(value)
+    raise ValueError(f"Unknown fill method: {method}")
+
+
+def missing_rows_mask(df, how='any', thresh=None):
+    """Boolean mask of the rows ``df.dropna(how=..., thresh=...)`` would drop."""
+    if thresh is not None:
+        return (df.notna().sum(axis=1) < thresh).to_numpy()
+    isna = df.isna()
+    return (isna.all(axis=1) if how == 'all' else isna.any(axis=1)).to_numpy()
+
+
+def drop_columns(df, columns):
+    return df.drop(columns=list(columns))
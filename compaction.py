@@ -0,0 +1,62 @@
+"""
+Memory Compaction for Loaded DataFrames
+Converts low-cardinality text columns to category and downcasts numeric
+columns to the smallest dtype that holds their values exactly.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Text columns with at most this share of distinct values become category
+DEFAULT_MAX_CATEGORY_RATIO = 0.5
+
+
+def _compact_column(series, max_category_ratio):
+    dtype = series.dtype
+
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        if len(series) == 0:
+            return series
+        if series.nunique(dropna=True) / len(series) <= max_category_ratio:
+            return series.astype('category')
+        return series
+
+    # Only NumPy-backed numerics are downcast; Arrow dtypes are already compact
+    if not isinstance(dtype, np.dtype):
+        return series
+
+    if pd.api.types.is_integer_dtype(dtype):
+        kind = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+        return pd.to_numeric(series, downcast=kind)
+
+    if pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+        downcast = series.astype(np.float32)
+        # Keep float64 unless every value survives the round trip
+        if np.array_equal(downcast.to_numpy(np.float64), series.to_numpy(), equal_nan=True):
+            return downcast
+    return series
+
+
+def compact_frame(df, max_category_ratio=DEFAULT_MAX_CATEGORY_RATIO):
+    """Return a compacted copy of ``df`` and a per-column memory report.
+
+    The report is a DataFrame with the dtype and deep memory usage of each
+    column before and after compaction.
+    """
+    columns = {}
+    rows = []
+    for col in df.columns:
+        before = df[col]
+        after = _compact_column(before, max_category_ratio)
+        columns[col] = after
+        rows.append({
+            'Column': col,
+            'Dtype Before': str(before.dtype),
+            'Dtype After': str(after.dtype),
+            'Bytes Before': int(before.memory_usage(index=False, deep=True)),
+            'Bytes After': int(after.memory_usage(index=False, deep=True)),
+        })
+
+    compacted = pd.DataFrame(columns, index=df.index)
+    report = pd.DataFrame(rows, columns=['Column', 'Dtype Before', 'Dtype After', 'Bytes Before', 'Bytes After'])
+    return compacted, report
@@ -0,0 +1,153 @@
+"""
+Correlation Analysis
+Pearson and Spearman correlation matrices computed blockwise with NumPy
+matrix products, a top-k strongest pairs table and a clustered column
+order for the heatmap.
+"""
+
+import importlib.util
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import record
+
+CORRELATION_METHODS = ["Pearson", "Spearman"]
+
+# Columns per block of the matrix products
+DEFAULT_BLOCK_COLUMNS = 256
+
+DEFAULT_TOP_PAIRS = 20
+
+# Columns preselected for the heatmap
+DEFAULT_HEATMAP_COLUMNS = 30
+
+
+def _prepare(df, columns, method):
+    """Float matrix of the columns (ranked for Spearman), centered, with NaNs set to 0, and its mask."""
+    values = np.column_stack([df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in columns])
+    if method == "Spearman":
+        values = pd.DataFrame(values).rank(method='average').to_numpy()
+    mask = ~np.isnan(values)
+    with np.errstate(invalid='ignore'):
+        # Centering does not change correlations but keeps the sums below well conditioned
+        values = values - np.nanmean(values, axis=0)
+    return np.where(mask, values, 0.0), mask.astype(np.float64)
+
+
+def correlation_matrix(df, columns, method="Pearson", block_columns=DEFAULT_BLOCK_COLUMNS):
+    """Correlation of every pair of ``columns``, using the rows where both are present.
+
+    Matches ``df[columns].corr()`` for Pearson. Spearman ranks each column
+    over its non-missing values and correlates the ranks, which matches
+    ``corr(method='spearman')`` when no values are missing. The matrix is
+    built from blocks of at most ``block_columns`` columns.
+    """
+    columns = list(columns)
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method: {method}")
+    n = len(columns)
+    result = np.full((n, n), np.nan)
+    if n == 0 or len(df) == 0:
+        return pd.DataFrame(result, index=columns, columns=columns)
+
+    record('column_scans', n)
+    values, mask = _prepare(df, columns, method)
+    if mask.all():
+        # No missing values: one product of the centered columns gives every covariance
+        cov = values.T @ values
+        scale = np.sqrt(np.diag(cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.clip(cov / np.outer(scale, scale), -1.0, 1.0)
+        constant = (scale == 0) | (len(df) < 2)
+        result[constant, :] = np.nan
+        result[:, constant] = np.nan
+        np.fill_diagonal(result, np.where(constant, np.nan, 1.0))
+        return pd.DataFrame(result, index=columns, columns=columns)
+
+    squares = values * values
+    blocks = [slice(start, min(start + block_columns, n)) for start in range(0, n, block_columns)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for i, rows in enumerate(blocks):
+            for cols in blocks[i:]:
+                # Pairwise-complete sums from matrix products: counts, sums, sums of squares, cross products
+                x, y = values[:, rows], values[:, cols]
+                mx, my = mask[:, rows], mask[:, cols]
+                count = mx.T @ my
+                sum_x, sum_y = x.T @ my, mx.T @ y
+                var_x = squares[:, rows].T @ my - sum_x * sum_x / count
+                var_y = mx.T @ squares[:, cols] - sum_y * sum_y / count
+                cov = x.T @ y - sum_x * sum_y / count
+                block = cov / np.sqrt(var_x * var_y)
+                block[(count < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+                block = np.clip(block, -1.0, 1.0)
+                result[rows, cols] = block
+                result[cols, rows] = block.T
+    np.fill_diagonal(result, np.where(np.isnan(np.diag(result)), np.nan, 1.0))
+    return pd.DataFrame(result, index=columns, columns=columns)
+
+
+def top_pairs(corr, k=DEFAULT_TOP_PAIRS):
+    """The ``k`` column pairs with the strongest correlation (by absolute value)."""
+    values = corr.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    pair_values = values[rows, cols]
+    keep = ~np.isnan(pair_values)
+    rows, cols, pair_values = rows[keep], cols[keep], pair_values[keep]
+    if len(pair_values) > k:
+        best = np.argpartition(-np.abs(pair_values), k - 1)[:k]
+        rows, cols, pair_values = rows[best], cols[best], pair_values[best]
+    order = np.argsort(-np.abs(pair_values), kind='stable')
+    return pd.DataFrame({
+        'Column A': corr.index[rows[order]],
+        'Column B': corr.columns[cols[order]],
+        'Correlation': pair_values[order],
+    })
+
+
+def clustering_available():
+    # SciPy is optional and only imported when a clustered heatmap is drawn
+    return importlib.util.find_spec('scipy') is not None
+
+
+def cluster_order(corr):
+    """Column order that places strongly correlated columns next to each other.
+
+    Uses average-linkage clustering on ``1 - |r|``; returns the original
+    order if SciPy is not installed or there are fewer than 3 columns.
+    """
+    if not clustering_available() or len(corr) < 3:
+        return list(corr.columns)
+    from scipy.cluster import hierarchy
+    from scipy.spatial.distance import squareform
+
+    distance = 1.0 - np.abs(np.nan_to_num(corr.to_numpy(), nan=0.0))
+    distance = np.clip((distance + distance.T) / 2, 0.0, None)
+    np.fill_diagonal(distance, 0.0)
+    linkage = hierarchy.linkage(squareform(distance, checks=False), method='average')
+    return [corr.columns[i] for i in hierarchy.leaves_list(linkage)]
+
+
+class CorrelationCache:
+    """Keeps the few most recent correlation matrices, keyed by data version, method and columns."""
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._matrices = OrderedDict()
+
+    def get(self, df, version, method, columns):
+        key = (version, method, tuple(columns))
+        corr = self._matrices.get(key)
+        if corr is not None:
+            record('cache_hits')
+        else:
+            corr = correlation_matrix(df, columns, method)
+            self._matrices[key] = corr
+            while len(self._matrices) > self.max_entries:
+                self._matrices.popitem(last=False)
+        self._matrices.move_to_end(key)
+        return corr
+
+    def clear(self):
+        self._matrices.clear()
@@ -0,0 +1,304 @@
+"""
+Shared Dataset Store
+Keeps one read-only copy of each distinct upload for every session of
+the process. The parsed frame is written once to an uncompressed Feather
+file on local disk and read back memory-mapped: numeric, categorical and
+Arrow-backed columns point straight into the mapping, so their pages are
+shared and can be dropped by the OS; only text columns are rebuilt in
+memory. Sessions take a lease on the dataset they work on; datasets
+without leases are idle and are closed (and later deleted) least-recently-
+used first once the memory or disk budget is exceeded.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ingestion import DEFAULT_MAX_BYTES
+from instrumentation import record
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # optional, without it the app keeps parsed frames in an in-memory FrameCache
+    pa = None
+
+# Budget for the in-memory part of open datasets (columns that cannot be mapped)
+DEFAULT_MEMORY_BYTES = DEFAULT_MAX_BYTES
+
+# Budget for the Feather files of all stored datasets
+DEFAULT_DISK_BYTES = 20 * 1024 ** 3
+
+
+def store_available():
+    return pa is not None
+
+
+class Lease:
+    """Marks a dataset as in use for as long as the holder keeps this object."""
+
+    def __init__(self, key):
+        self.key = key
+
+
+def _to_arrow(series):
+    """An Arrow array holding ``series``, or None when it is better kept as it is."""
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufmM':
+        # NaN stays a float value instead of becoming a null, so the column maps back without a copy
+        return pa.array(series.to_numpy(), from_pandas=False)
+    if isinstance(dtype, (pd.CategoricalDtype, pd.ArrowDtype, pd.StringDtype)) or dtype == object:
+        array = pa.array(series, from_pandas=True)
+        # Arrow-backed columns come in parse chunks; one chunk per column keeps every column whole in the file
+        return array.combine_chunks() if isinstance(array, pa.ChunkedArray) else array
+    return None
+
+
+def _missing_value(series):
+    """The value standing for missing text in an object column (NaN after read_csv, None after pyarrow)."""
+    missing = series[series.isna()]
+    return missing.iloc[0] if len(missing) else None
+
+
+def _from_arrow(chunked, dtype, missing=None):
+    """A pandas array of ``dtype`` over ``chunked`` and whether it points into the mapping.
+
+    Missing values of object columns are restored as ``missing``.
+    """
+    if isinstance(dtype, pd.ArrowDtype):
+        return pd.arrays.ArrowExtensionArray(chunked), True
+    if isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow':
+        return pd.arrays.ArrowStringArray(chunked), True
+    array = chunked.combine_chunks() if chunked.num_chunks != 1 else chunked.chunk(0)
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iufmM' and array.null_count == 0:
+        return array.to_numpy(zero_copy_only=True), True
+    if isinstance(dtype, pd.CategoricalDtype) and array.null_count == 0:
+        codes = array.indices.to_numpy(zero_copy_only=True)
+        return pd.Categorical.from_codes(codes, dtype=dtype), True
+    values = array.to_pandas()
+    if dtype == object and missing is not None:
+        values = values.where(values.notna(), missing)
+    return values.astype(dtype).array, False
+
+
+class _Entry:
+    def __init__(self, key, path, meta):
+        self.key = key
+        self.path = path
+        self.meta = meta
+        self.frame = None
+        self.leases = weakref.WeakSet()
+        self.kept = {}  # columns that could not be written to Arrow, held as they are
+        self.missing = {}  # missing-value object of each object column
+        self.index = None
+        self.columns = None
+        self.dtypes = None
+        self.file_bytes = 0
+        self.mapped_bytes = 0
+        self.memory_bytes = 0
+        self.last_used = time.time()
+
+
+class DatasetStore:
+    """Process-wide store of read-only datasets keyed by content hash.
+
+    Offers the ``get`` / ``get_meta`` / ``put`` interface of
+    ``ingestion.FrameCache``, so ``load_csv`` can use either. ``put``
+    returns the memory-mapped frame, which callers share and must not
+    modify in place (copy-on-write makes a lazy copy safe).
+
+    ``memory_bytes`` counts the columns of open datasets that live in
+    memory; mapped columns are reported separately. Over the memory
+    budget, idle datasets are closed but keep their file, so reopening
+    one only maps it again. Over the disk budget, idle datasets are
+    deleted. Datasets in use are never evicted, even over budget.
+    """
+
+    def __init__(self, directory=None, memory_bytes=DEFAULT_MEMORY_BYTES, disk_bytes=DEFAULT_DISK_BYTES):
+        if pa is None:
+            raise ImportError("The dataset store needs pyarrow.")
+        # A private directory per process, removed when the store is garbage collected or at exit
+        self._directory = tempfile.TemporaryDirectory(prefix='eda-store-', dir=directory,
+                                                      ignore_cleanup_errors=True)
+        self.directory = self._directory.name
+        self.max_memory_bytes = memory_bytes
+        self.max_disk_bytes = disk_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        """The shared frame of ``key`` (reopening its file if it was closed), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.frame is None:
+                self._open(entry)
+            self._entries.move_to_end(key)
+            entry.last_used = time.time()
+            self.hits += 1
+            record('cache_hits')
+            frame = entry.frame
+            self._evict()
+            return frame
+
+    def get_meta(self, key):
+        """Return the metadata stored alongside a dataset."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.meta if entry is not None else None
+
+    def put(self, key, df, meta=None):
+        """Store ``df`` and return the memory-mapped frame that replaces it."""
+        entry = _Entry(key, os.path.join(self.directory, f"{key}.feather"), meta)
+        entry.index, entry.columns, entry.dtypes = df.index, df.columns, list(df.dtypes)
+        arrays, names = [], []
+        for i, (_, series) in enumerate(df.items()):
+            try:
+                array = _to_arrow(series)
+            except (pa.ArrowException, TypeError, ValueError):  # e.g. mixed types in an object column
+                array = None
+            if array is None:
+                entry.kept[i] = series.array
+            else:
+                if series.dtype == object:
+                    entry.missing[i] = _missing_value(series)
+                arrays.append(array)
+                names.append(str(i))
+        # Identical content has the same key, so a file written by a concurrent upload is reused
+        if not os.path.exists(entry.path):
+            # One record batch, so every column is a single contiguous chunk in the file
+            partial = f"{entry.path}.{threading.get_ident()}.partial"
+            feather.write_feather(pa.table(arrays, names=names), partial, compression='uncompressed',
+                                  chunksize=max(len(df), 1))
+            os.replace(partial, entry.path)
+        entry.file_bytes = os.path.getsize(entry.path)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                entry.leases = old.leases
+            self._entries[key] = entry
+            self._open(entry)
+            frame = entry.frame
+            self._evict()
+            return frame
+
+    def acquire(self, key):
+        """A lease keeping ``key`` open while it is referenced, or None if it is not stored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            lease = Lease(key)
+            entry.leases.add(lease)
+            return lease
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._delete(entry)
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                self._delete(entry)
+            self._entries.clear()
+
+    def _open(self, entry):
+        table = feather.read_table(entry.path, memory_map=True)
+        columns, mapped, memory = {}, 0, int(entry.index.memory_usage(deep=True))
+        for i, dtype in enumerate(entry.dtypes):
+            if i in entry.kept:
+                values, is_mapped = entry.kept[i], False
+            else:
+                values, is_mapped = _from_arrow(table.column(str(i)), dtype, entry.missing.get(i))
+            columns[i] = values
+            size = int(pd.Series(values, copy=False).memory_usage(index=False, deep=not is_mapped))
+            if is_mapped:
+                mapped += size
+            else:
+                memory += size
+        frame = pd.DataFrame(columns, index=entry.index, copy=False)
+        frame.columns = entry.columns
+        entry.frame, entry.mapped_bytes, entry.memory_bytes = frame, mapped, memory
+
+    def _close(self, entry):
+        entry.frame = None
+        entry.mapped_bytes = entry.memory_bytes = 0
+
+    def _delete(self, entry):
+        self._close(entry)
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Close, then delete, idle datasets (least recently used first) until both budgets are met."""
+        # The most recently used dataset is always kept, like in FrameCache
+        idle = [entry for entry in list(self._entries.values())[:-1] if not entry.leases]
+        for entry in idle:
+            if sum(e.memory_bytes for e in self._entries.values()) <= self.max_memory_bytes:
+                break
+            if entry.frame is not None:
+                self._close(entry)
+                self.evictions += 1
+        for entry in idle:
+            if sum(e.file_bytes for e in self._entries.values()) <= self.max_disk_bytes:
+                break
+            del self._entries[entry.key]
+            self._delete(entry)
+            self.evictions += 1
+
+    def usage(self):
+        """One row per stored dataset, most recently used first."""
+        with self._lock:
+            rows = [{
+                'key': entry.key,
+                'state': "open" if entry.frame is not None else "on disk",
+                'sessions': len(entry.leases),
+                'rows': len(entry.index),
+                'columns': len(entry.columns),
+                'mapped_bytes': entry.mapped_bytes,
+                'memory_bytes': entry.memory_bytes,
+                'file_bytes': entry.file_bytes,
+                'last_used': entry.last_used,
+            } for entry in reversed(self._entries.values())]
+        return pd.DataFrame(rows, columns=['key', 'state', 'sessions', 'rows', 'columns', 'mapped_bytes',
+                                           'memory_bytes', 'file_bytes', 'last_used'])
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'open': sum(entry.frame is not None for entry in self._entries.values()),
+                'in_use': sum(bool(entry.leases) for entry in self._entries.values()),
+                'bytes': sum(entry.memory_bytes for entry in self._entries.values()),
+                'mapped_bytes': sum(entry.mapped_bytes for entry in self._entries.values()),
+                'file_bytes': sum(entry.file_bytes for entry in self._entries.values()),
+                'max_bytes': self.max_memory_bytes,
+                'max_file_bytes': self.max_disk_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,132 @@
+"""
+Duplicate Detection with Cached Row Fingerprints
+Each row of a set of key columns is reduced to a 64-bit hash. Duplicate
+counts, duplicate groups and "drop duplicates" all read from those
+fingerprints, which are cached per column version and carried over when
+rows are dropped instead of being recomputed.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import record
+
+KEEP_OPTIONS = {
+    "Keep first": 'first',
+    "Keep last": 'last',
+    "Drop all copies": False,
+}
+
+# Multiplier used to fold per-column hashes into one row hash
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+
+def row_fingerprints(df, columns):
+    """64-bit hash of each row of ``df[columns]``.
+
+    Rows with equal values get equal hashes; different rows collide only
+    with the usual 64-bit hash probability.
+    """
+    record('column_scans', len(columns))
+    combined = np.zeros(len(df), dtype=np.uint64)
+    for col in columns:
+        hashes = pd.util.hash_pandas_object(df[col], index=False).to_numpy()
+        combined = combined * _HASH_MULTIPLIER ^ hashes
+    return combined
+
+
+def _duplicated(fingerprints, keep='first'):
+    return pd.Series(fingerprints, copy=False).duplicated(keep=keep).to_numpy()
+
+
+class DuplicateIndex:
+    """Row fingerprints and duplicate masks for the working DataFrame.
+
+    Fingerprints are kept for the few most recent key-column subsets and
+    are valid while the versions of their columns are unchanged. Masks
+    are cached for the current frame version.
+    """
+
+    def __init__(self, versions, max_subsets=4):
+        self.versions = versions
+        self.max_subsets = max_subsets
+        self._fingerprints = OrderedDict()
+        self._masks = {}
+        self._masks_version = None
+
+    def _subset(self, df, subset):
+        if not subset:
+            return tuple(df.columns)
+        # Column order does not change which rows are duplicates
+        chosen = set(subset)
+        return tuple(col for col in df.columns if col in chosen)
+
+    def fingerprints(self, df, subset=None):
+        """Row hashes over ``subset`` (all columns if empty), cached by column version."""
+        columns = self._subset(df, subset)
+        tokens = tuple(self.versions.token(col) for col in columns)
+        cached = self._fingerprints.get(columns)
+        if cached is not None and cached[0] is None and cached[2] == self.versions.frame:
+            # Carried over by keep_rows for this frame version
+            cached = (tokens, cached[1], None)
+            self._fingerprints[columns] = cached
+        if cached is None or cached[0] != tokens or len(cached[1]) != len(df):
+            cached = (tokens, row_fingerprints(df, columns), None)
+            self._fingerprints[columns] = cached
+            while len(self._fingerprints) > self.max_subsets:
+                self._fingerprints.popitem(last=False)
+        self._fingerprints.move_to_end(columns)
+        return cached[1]
+
+    def duplicated(self, df, subset=None, keep='first'):
+        """Boolean mask like ``df.duplicated(subset, keep=keep)``."""
+        if self._masks_version != self.versions.frame:
+            self._masks.clear()
+            self._masks_version = self.versions.frame
+        key = (self._subset(df, subset), keep)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = _duplicated(self.fingerprints(df, subset), keep)
+            self._masks[key] = mask
+        return mask
+
+    def duplicated_count(self, df, subset=None):
+        return int(np.count_nonzero(self.duplicated(df, subset)))
+
+    def groups(self, df, subset=None, limit=None):
+        """Rows that have a duplicate, each group's rows together in order of first appearance.
+
+        Returns ``(rows, group_count)``; ``rows`` has a leading
+        ``Duplicate Group`` column and at most ``limit`` rows.
+        """
+        positions = np.flatnonzero(self.duplicated(df, subset, keep=False))
+        group_ids, uniques = pd.factorize(self.fingerprints(df, subset)[positions])
+        order = np.argsort(group_ids, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        rows = df.iloc[positions[order]]
+        rows.insert(0, 'Duplicate Group', group_ids[order] + 1, allow_duplicates=True)
+        return rows, len(uniques)
+
+    def keep_rows(self, df, kept):
+        """Carry fingerprints over a step that only removes rows.
+
+        Call with the frame before the step and the kept row positions,
+        before the versions are bumped for the step. Fingerprints that are
+        current for ``df`` are filtered to the kept rows and become valid
+        for the next frame version; the rest are dropped.
+        """
+        for columns, (tokens, hashes, _) in list(self._fingerprints.items()):
+            current = tokens == tuple(self.versions.token(col) for col in columns)
+            if current and len(hashes) == len(df):
+                self._fingerprints[columns] = (None, hashes[kept], self.versions.frame + 1)
+            else:
+                del self._fingerprints[columns]
+
+    def prune(self, columns):
+        """Drop fingerprints that use columns which no longer exist."""
+        keep = set(columns)
+        for subset in [subset for subset in self._fingerprints if not keep.issuperset(subset)]:
+            del self._fingerprints[subset]
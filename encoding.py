@@ -0,0 +1,135 @@
+"""
+Categorical Encoding Operations
+Pure functions behind the Categorical Encoding section. Each returns a
+new DataFrame and leaves its input unchanged.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+# Label for values folded together by the one-hot max-categories cap
+OTHER_LABEL = 'other'
+
+
+def fold_rare(series, max_categories, other=OTHER_LABEL):
+    """Keep the ``max_categories`` most frequent values and map the rest to ``other``."""
+    codes, uniques = pd.factorize(series)
+    if max_categories is None or len(uniques) <= max_categories:
+        return series
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    keep = np.zeros(len(uniques), dtype=bool)
+    keep[np.argsort(-counts, kind='stable')[:max_categories]] = True
+
+    labels = [str(value) for value in uniques[keep]] + [other]
+    # Kept values get their rank among kept values; everything else becomes `other`
+    new_codes = np.where(keep, np.cumsum(keep) - 1, len(labels) - 1)
+    folded = np.where(codes >= 0, new_codes[np.maximum(codes, 0)], -1)
+    return pd.Series(pd.Categorical.from_codes(folded, categories=labels), index=series.index, name=series.name)
+
+
+def estimate_one_hot(n_rows, cardinalities, sparse=False, max_categories=None):
+    """Estimate ``(new_columns, bytes)`` for one-hot encoding.
+
+    ``cardinalities`` maps each column to its number of distinct values.
+    Dense output costs one byte per row per indicator column; sparse
+    output stores about one value (1 byte) and one int32 index per row
+    and source column.
+    """
+    new_columns = 0
+    for unique in cardinalities.values():
+        if max_categories is not None and unique > max_categories:
+            unique = max_categories + 1
+        new_columns += unique
+    if sparse:
+        return new_columns, n_rows * len(cardinalities) * 5
+    return new_columns, n_rows * new_columns
+
+
+def one_hot_encode(df, columns, sparse=False, max_categories=None, other=OTHER_LABEL):
+    """Replace each column with one indicator column per distinct value.
+
+    All columns are encoded in a single ``get_dummies`` call and joined
+    once. With ``max_categories`` the rarer values of a column are folded
+    into ``other`` first; ``sparse`` stores the indicators as sparse bools.
+    """
+    columns = list(columns)
+    source = df[columns].copy(deep=False)
+    # get_dummies emits a column for every category, used or not, while the estimate counts only values present
+    for col in columns:
+        if isinstance(source[col].dtype, pd.CategoricalDtype):
+            source[col] = source[col].cat.remove_unused_categories()
+    if max_categories is not None:
+        source = pd.DataFrame({col: fold_rare(source[col], max_categories, other) for col in columns},
+                              index=df.index)
+    encoded = pd.get_dummies(source, prefix=columns, drop_first=False, sparse=sparse)
+    return pd.concat([df.drop(columns=columns), encoded], axis=1)
+
+
+def _distinct_labels(series):
+    """Factorize ``series`` and return ``(codes, labels)``, labels being the distinct values as strings.
+
+    Only the distinct values are converted to strings, not every row.
+    Missing values form their own label (e.g. ``'nan'``).
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    labels = np.asarray(pd.Index(uniques).astype(str), dtype=object)
+    return codes, labels
+
+
+def _encode_labels(series, classes=None):
+    """Label ``series`` with one factorize pass, fitting ``classes`` when none are given.
+
+    Returns ``(labels, classes, unseen)``.
+    """
+    codes, labels = _distinct_labels(series)
+    if classes is None:
+        classes, positions = np.unique(labels, return_inverse=True)
+        classes = classes.tolist()
+    else:
+        positions = pd.Index(classes).get_indexer(labels)
+    encoded = positions[codes].astype(np.int64)
+    unseen = int(np.count_nonzero(encoded < 0))
+    return pd.Series(encoded, index=series.index, name=series.name), classes, unseen
+
+
+def label_encode(df, columns, mappings=None):
+    """Replace each column with integer labels assigned in sorted order.
+
+    Columns with an entry in ``mappings`` (column -> class list) reuse it
+    instead of being refitted. Returns ``(new_df, classes, unseen)``:
+    the class list used for each column and the per-column count of
+    values not in a reused mapping.
+    """
+    mappings = mappings or {}
+    df_encoded = df.copy(deep=False)
+    classes, unseen = {}, {}
+    for col in columns:
+        df_encoded[col], classes[col], unseen[col] = _encode_labels(df[col], mappings.get(col))
+    return df_encoded, classes, unseen
+
+
+def mappings_to_json(mappings):
+    """Serialize label mappings as ``{column: {label: code}}`` JSON bytes."""
+    table = {str(col): {label: code for code, label in enumerate(classes)} for col, classes in mappings.items()}
+    return json.dumps(table, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def mappings_from_json(data):
+    """Read label mappings written by ``mappings_to_json``."""
+    table = json.loads(data)
+    if not isinstance(table, dict):
+        raise ValueError("Label mapping file must hold a JSON object of columns.")
+    mappings = {}
+    for col, codes in table.items():
+        if not isinstance(codes, dict):
+            raise ValueError(f"Mapping for '{col}' must map labels to codes.")
+        gaps = ValueError(f"Codes for '{col}' must be 0, 1, 2, ... without gaps.")
+        if not all(isinstance(code, int) and not isinstance(code, bool) for code in codes.values()):
+            raise gaps
+        ordered = sorted(codes.items(), key=lambda item: item[1])
+        if [code for _, code in ordered] != list(range(len(ordered))):
+            raise gaps
+        mappings[col] = [str(label) for label, _ in ordered]
+    return mappings
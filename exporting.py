@@ -0,0 +1,185 @@
+"""
+Data Export for the Streamlit App
+Builds each download format on request, writing the frame in row chunks
+so no full intermediate text copy of the dataset is held in memory.
+"""
+
+import gzip
+import io
+import time
+
+import pandas as pd
+
+from instrumentation import record
+
+try:
+    import zstandard
+except ImportError:  # optional, enables zstd-compressed CSV
+    zstandard = None
+
+# Rows serialized per chunk
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Excel's per-sheet row limit, including the header row
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def iter_chunks(df, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield consecutive row slices of ``df``."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _write_csv(df, stream, chunk_rows):
+    for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+        stream.write(chunk.to_csv(index=False, header=(i == 0)).encode('utf-8'))
+
+
+def _write_csv_gzip(df, stream, chunk_rows):
+    with gzip.GzipFile(fileobj=stream, mode='wb', compresslevel=6) as gz:
+        _write_csv(df, gz, chunk_rows)
+
+
+def _write_csv_zstd(df, stream, chunk_rows):
+    compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+    with compressor.stream_writer(stream, closefd=False) as writer:
+        _write_csv(df, writer, chunk_rows)
+
+
+def _write_json(df, stream, chunk_rows):
+    # Same layout as df.to_json(orient='records', indent=2), built chunk by chunk
+    stream.write(b'[')
+    first = True
+    for chunk in iter_chunks(df, chunk_rows):
+        if chunk.empty:
+            continue
+        body = chunk.to_json(orient='records', indent=2).strip()[1:-1].strip('\n')
+        stream.write((('\n' if first else ',\n') + body).encode('utf-8'))
+        first = False
+    stream.write(b']' if first else b'\n]')
+
+
+def _write_jsonl(df, stream, chunk_rows):
+    for chunk in iter_chunks(df, chunk_rows):
+        if chunk.empty:
+            continue
+        text = chunk.to_json(orient='records', lines=True)
+        stream.write((text if text.endswith('\n') else text + '\n').encode('utf-8'))
+
+
+def _sparse_columns(df):
+    return [col for col in df.columns if isinstance(df[col].dtype, pd.SparseDtype)]
+
+
+def densify(df):
+    """Convert sparse columns (e.g. from sparse one-hot encoding) to dense ones."""
+    sparse = _sparse_columns(df)
+    if not sparse:
+        return df
+    return df.astype({col: df[col].dtype.subtype for col in sparse})
+
+
+def _write_parquet(df, stream, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Arrow has no sparse type: sparse columns get their dense type in the
+    # schema and are densified one chunk at a time
+    sparse = _sparse_columns(df)
+    dense_schema = pa.Schema.from_pandas(df.drop(columns=sparse), preserve_index=False)
+    schema = pa.schema([
+        pa.field(str(col), pa.from_numpy_dtype(df[col].dtype.subtype)) if col in sparse
+        else dense_schema.field(str(col))
+        for col in df.columns
+    ], metadata=dense_schema.metadata)
+    with pq.ParquetWriter(stream, schema, compression='snappy') as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(densify(chunk), schema=schema, preserve_index=False))
+
+
+def _write_excel(df, stream, chunk_rows):
+    from openpyxl import Workbook
+
+    if len(df) + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS - 1:,} data rows; use CSV or Parquet instead.")
+
+    # Write-only mode streams rows to disk instead of building the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([str(col) for col in df.columns])
+    for chunk in iter_chunks(df, chunk_rows):
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(stream)
+
+
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv', _write_csv),
+    'CSV (gzip)': ('csv.gz', 'application/gzip', _write_csv_gzip),
+    'CSV (zstd)': ('csv.zst', 'application/zstd', _write_csv_zstd),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', _write_excel),
+    'JSON': ('json', 'application/json', _write_json),
+    'JSON Lines': ('jsonl', 'application/x-ndjson', _write_jsonl),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', _write_parquet),
+}
+
+
+def available_formats():
+    """Export formats usable with the installed libraries."""
+    return [name for name in EXPORT_FORMATS if name != 'CSV (zstd)' or zstandard is not None]
+
+
+def export_bytes(df, fmt, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Serialize ``df`` in the given export format and return the bytes."""
+    _, _, writer = EXPORT_FORMATS[fmt]
+    record('column_scans', len(df.columns))
+    stream = io.BytesIO()
+    writer(df, stream, chunk_rows)
+    return stream.getvalue()
+
+
+def export_file(df, fmt, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write ``df`` in the given export format straight to a file."""
+    _, _, writer = EXPORT_FORMATS[fmt]
+    with open(path, 'wb') as stream:
+        writer(df, stream, chunk_rows)
+
+
+class ExportCache:
+    """Holds built exports for the current dataset version only."""
+
+    def __init__(self):
+        self.version = None
+        self._exports = {}
+
+    def get(self, fmt, version):
+        if version != self.version:
+            return None
+        return self._exports.get(fmt)
+
+    def build(self, df, fmt, version, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Build an export (or reuse it) and return ``(data, seconds)``."""
+        cached = self.get(fmt, version)
+        if cached is not None:
+            record('cache_hits')
+            return cached
+        if version != self.version:
+            self.version = version
+            self._exports.clear()
+        start = time.perf_counter()
+        data = export_bytes(df, fmt, chunk_rows)
+        self._exports[fmt] = (data, time.perf_counter() - start)
+        return self._exports[fmt]
+
+    def clear(self):
+        self.version = None
+        self._exports.clear()
+
+
+def export_filename(fmt, stem='processed_data'):
+    return f"{stem}.{EXPORT_FORMATS[fmt][0]}"
+
+
+def export_mime(fmt):
+    return EXPORT_FORMATS[fmt][1]
@@ -0,0 +1,78 @@
+"""
+Rendered Figure Cache
+Stores charts as encoded PNG/SVG bytes in a size-bounded LRU and closes the
+matplotlib figure as soon as it is rendered, so pyplot's figure registry
+does not grow over a session.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+from instrumentation import record
+
+DEFAULT_MAX_BYTES = 32 * 1024 ** 2
+
+
+def render_figure(fig, fmt='png', dpi=100):
+    """Encode a figure to PNG or SVG bytes and close it."""
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """LRU cache of rendered figures bounded by total encoded size.
+
+    Keys should identify the data and the chart, e.g.
+    ``(dataset_version, chart_type, params)``.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return sum(len(data) for data in self._images.values())
+
+    def __len__(self):
+        with self._lock:
+            return len(self._images)
+
+    def render(self, key, build, fmt='png'):
+        """Return the encoded chart for ``key``, calling ``build()`` on a miss.
+
+        ``build`` must return a matplotlib figure; it is closed after
+        encoding.
+        """
+        full_key = (key, fmt)
+        with self._lock:
+            data = self._images.get(full_key)
+            if data is not None:
+                self._images.move_to_end(full_key)
+                self.hits += 1
+                record('cache_hits')
+                return data
+            self.misses += 1
+
+        data = render_figure(build(), fmt=fmt)
+        with self._lock:
+            self._images[full_key] = data
+            self._images.move_to_end(full_key)
+            while len(self._images) > 1 and sum(len(d) for d in self._images.values()) > self.max_bytes:
+                self._images.popitem(last=False)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
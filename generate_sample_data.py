@@ -1,16 +1,24 @@
 """
 Sample Data Generator for Testing the Streamlit App
-Creates a sample laptop dataset similar to laptopData.csv
+Creates a sample laptop dataset similar to laptopData.csv. Columns are
+drawn as whole NumPy arrays and written in chunks, so it scales from the
+default 100 rows to tens of millions.
+
+Usage:
+    python generate_sample_data.py --rows 10000000 --output big_laptops.csv
 """
 
-import pandas as pd
+import argparse
+import time
+
 import numpy as np
-import random
-from datetime import datetime
+import pandas as pd
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional, writes CSV about 5x faster than DataFrame.to_csv
+    pa = None
 
 # Sample data
 companies = ['Dell', 'HP', 'Lenovo', 'Asus', 'Apple', 'MSI', 'Razer', 'Acer']
@@ -21,46 +29,127 @@ gpu_brands = ['Intel', 'Nvidia', 'AMD']
 gpu_models = ['UHD', 'GeForce GTX 1050', 'GeForce RTX 3060', 'Radeon RX', 'M1', 'M2']
 os_types = ['Windows 10', 'Windows 11', 'macOS', 'Linux']
 memory_types = ['512GB SSD', '256GB SSD', '1TB SSD', '512GB HDD', '256GB SSD+512GB HDD', '1TB SSD+512GB HDD']
+ram_sizes = [4, 8, 16, 32]
+
+# Every text value a column can take, so a column is drawn as indexes into these tables
+RAM_LABELS = np.array([f"{size}GB" for size in ram_sizes], dtype=object)
+WEIGHT_LABELS = np.array([f"{hundredths / 100:.2f}kg" for hundredths in range(150, 501)], dtype=object)
+CPU_LABELS = np.array([f"{brand} {model} {tenths / 10:.1f}GHz"
+                       for brand in cpu_brands for model in cpu_models for tenths in range(15, 36)], dtype=object)
+GPU_LABELS = np.array([f"{brand} {model}" for brand in gpu_brands for model in gpu_models], dtype=object)
+
+# Columns that get missing values
+MISSING_COLUMNS = ['Ram', 'Weight', 'Price']
+
+DEFAULT_ROWS = 100
+DEFAULT_MISSING_RATE = 0.1
+DEFAULT_DUPLICATE_RATE = 0.05
+DEFAULT_CARDINALITY = 50
+DEFAULT_SEED = 42
+
+# Rows generated and written per chunk
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def _choose(rng, labels, n):
+    return np.asarray(labels, dtype=object)[rng.integers(0, len(labels), n)]
+
+
+def generate_frame(rows, rng, missing_rate=DEFAULT_MISSING_RATE, duplicate_rate=DEFAULT_DUPLICATE_RATE,
+                   extra_numeric=0, extra_categorical=0, cardinality=DEFAULT_CARDINALITY):
+    """``rows`` laptop records plus ``duplicate_rate * rows`` copies of random rows.
+
+    ``extra_numeric`` and ``extra_categorical`` add ``Feature_<i>`` and
+    ``Category_<i>`` columns; the categorical ones take ``cardinality``
+    distinct values. ``missing_rate`` of Ram, Weight, Price and the extra
+    columns is set missing.
+    """
+    data = {
+        'Company': _choose(rng, companies, rows),
+        'TypeName': _choose(rng, type_names, rows),
+        'Inches': rng.uniform(13.3, 17.3, rows).round(1),
+        'Ram': _choose(rng, RAM_LABELS, rows),
+        'Weight': _choose(rng, WEIGHT_LABELS, rows),
+        'Cpu': _choose(rng, CPU_LABELS, rows),
+        'Memory': _choose(rng, memory_types, rows),
+        'Gpu': _choose(rng, GPU_LABELS, rows),
+        'OpSys': _choose(rng, os_types, rows),
+        'Price': rng.uniform(20000, 200000, rows).round(-2),  # Round to nearest 100
+    }
+    category_labels = np.array([f"cat_{i}" for i in range(cardinality)], dtype=object)
+    for i in range(1, extra_numeric + 1):
+        data[f'Feature_{i}'] = rng.normal(size=rows)
+    for i in range(1, extra_categorical + 1):
+        data[f'Category_{i}'] = _choose(rng, category_labels, rows)
+
+    # Introduce some missing values
+    missing = int(rows * missing_rate)
+    for col in MISSING_COLUMNS + [col for col in data if col.startswith(('Feature_', 'Category_'))]:
+        positions = rng.choice(rows, size=missing, replace=False)
+        if data[col].dtype == object:
+            data[col][positions] = None
+        else:
+            data[col][positions] = np.nan
+
+    # Introduce some duplicates
+    df = pd.DataFrame(data)
+    duplicates = rng.choice(rows, size=int(rows * duplicate_rate), replace=False)
+    return pd.concat([df, df.iloc[duplicates]], ignore_index=True)
+
+
+def write_dataset(path, rows=DEFAULT_ROWS, seed=DEFAULT_SEED, chunk_rows=DEFAULT_CHUNK_ROWS, **options):
+    """Generate ``rows`` records (plus duplicates) chunk by chunk into a CSV file.
+
+    Duplicates are copies of rows from the same chunk. Returns the first
+    chunk and the total ``(rows, missing values)`` written.
+    """
+    rng = np.random.default_rng(seed)
+    first, total_rows, total_missing = None, 0, 0
+    with open(path, 'wb') as f:
+        for start in range(0, max(rows, 1), chunk_rows):
+            chunk = generate_frame(min(chunk_rows, rows - start), rng, **options)
+            if pa is not None:
+                pa_csv.write_csv(pa.Table.from_pandas(chunk, preserve_index=False), f,
+                                 pa_csv.WriteOptions(include_header=(start == 0)))
+            else:
+                f.write(chunk.to_csv(index=False, header=(start == 0)).encode('utf-8'))
+            total_rows += len(chunk)
+            total_missing += int(chunk.isnull().sum().sum())
+            if first is None:
+                first = chunk
+    return first, total_rows, total_missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic laptop dataset.")
+    parser.add_argument('-n', '--rows', type=int, default=DEFAULT_ROWS, help="rows before duplicates are added")
+    parser.add_argument('-o', '--output', default='sample_laptop_data.csv')
+    parser.add_argument('--missing-rate', type=float, default=DEFAULT_MISSING_RATE)
+    parser.add_argument('--duplicate-rate', type=float, default=DEFAULT_DUPLICATE_RATE)
+    parser.add_argument('--extra-numeric', type=int, default=0, help="extra numeric Feature_<i> columns")
+    parser.add_argument('--extra-categorical', type=int, default=0, help="extra categorical Category_<i> columns")
+    parser.add_argument('--cardinality', type=int, default=DEFAULT_CARDINALITY,
+                        help="distinct values of each extra categorical column")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    first, rows, missing = write_dataset(
+        args.output, args.rows, args.seed, args.chunk_rows, missing_rate=args.missing_rate,
+        duplicate_rate=args.duplicate_rate, extra_numeric=args.extra_numeric,
+        extra_categorical=args.extra_categorical, cardinality=args.cardinality
+    )
+    print(f"✅ Sample dataset created: {args.output} in {time.perf_counter() - start:.1f}s")
+    print(f"\nDataset Info:")
+    print(f"- Shape: ({rows}, {len(first.columns)})")
+    print(f"- Missing values: {missing}")
+    print(f"- Duplicates added: {rows - args.rows}")
+    print(f"\nFirst 5 rows:")
+    print(first.head())
+    print(f"\nData types:")
+    print(first.dtypes)
+
 
-# Generate sample data
-n_samples = 100
-
-data = {
-    'Company': [random.choice(companies) for _ in range(n_samples)],
-    'TypeName': [random.choice(type_names) for _ in range(n_samples)],
-    'Inches': np.random.uniform(13.3, 17.3, n_samples).round(1),
-    'Ram': [f"{random.choice([4, 8, 16, 32])}GB" for _ in range(n_samples)],
-    'Weight': [f"{random.uniform(1.5, 5.0):.2f}kg" for _ in range(n_samples)],
-    'Cpu': [f"{random.choice(cpu_brands)} {random.choice(cpu_models)} {random.uniform(1.5, 3.5):.1f}GHz" 
-            for _ in range(n_samples)],
-    'Memory': [random.choice(memory_types) for _ in range(n_samples)],
-    'Gpu': [f"{random.choice(gpu_brands)} {random.choice(gpu_models)}" for _ in range(n_samples)],
-    'OpSys': [random.choice(os_types) for _ in range(n_samples)],
-    'Price': np.random.uniform(20000, 200000, n_samples).round(-2),  # Round to nearest 100
-}
-
-# Create DataFrame
-df = pd.DataFrame(data)
-
-# Introduce some missing values (10%)
-missing_percentage = 0.1
-for col in ['Ram', 'Weight', 'Price']:
-    missing_indices = np.random.choice(df.index, size=int(len(df) * missing_percentage), replace=False)
-    df.loc[missing_indices, col] = np.nan
-
-# Introduce some duplicates (5%)
-n_duplicates = int(len(df) * 0.05)
-duplicate_indices = np.random.choice(df.index, size=n_duplicates, replace=False)
-df = pd.concat([df, df.loc[duplicate_indices]], ignore_index=True)
-
-# Save to CSV
-df.to_csv('sample_laptop_data.csv', index=False)
-print(f"✅ Sample dataset created: sample_laptop_data.csv")
-print(f"\nDataset Info:")
-print(f"- Shape: {df.shape}")
-print(f"- Missing values: {df.isnull().sum().sum()}")
-print(f"- Duplicates: {df.duplicated().sum()}")
-print(f"\nFirst 5 rows:")
-print(df.head())
-print(f"\nData types:")
-print(df.dtypes)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Group By Engine
+Computes each key column's group index once and evaluates many
+aggregations over several value columns from it, caching both per column
+version. Named presets describe which aggregations to show.
+"""
+
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import record
+
+# Statistics offered in the UI; any percentile can be written as ``p<percent>``, e.g. ``p99``
+AGGREGATIONS = ["mean", "count", "sum", "min", "max", "median", "std", "p25", "p75", "p90"]
+
+# Presets shown in "Predefined Analyses" when their columns exist
+DEFAULT_PRESETS = {
+    "Laptops per Company": {'key': 'Company', 'aggregations': {'Price': ['mean', 'count'], 'Weight': ['mean']}},
+    "Price per CPU Brand": {'key': 'Cpu_Brand', 'aggregations': {'Price': ['mean']}},
+    "Price per GPU Brand": {'key': 'Gpu_Brand', 'aggregations': {'Price': ['mean']}},
+    "Price per RAM Size": {'key': 'Ram', 'aggregations': {'Price': ['mean']}},
+    "Price per Laptop Type": {'key': 'TypeName', 'aggregations': {'Price': ['mean']}},
+    "Laptops per Operating System": {'key': 'OpSys', 'aggregations': {'Price': ['count']}},
+}
+
+_PERCENTILE = re.compile(r'^p(\d+(?:\.\d+)?)$')
+
+
+def quantile_of(stat):
+    """The quantile (0-1) a ``p<percent>`` statistic stands for, or None for other statistics."""
+    match = _PERCENTILE.match(stat)
+    if match is None:
+        return None
+    q = float(match.group(1)) / 100
+    if not 0 <= q <= 1:
+        raise ValueError(f"Percentile out of range: {stat}")
+    return q
+
+
+def validate_stats(stats):
+    for stat in stats:
+        if stat not in AGGREGATIONS and quantile_of(stat) is None:
+            raise ValueError(f"Unknown aggregation: {stat}")
+
+
+def group_index(series):
+    """``(codes, keys)`` for grouping by ``series``: sorted keys, code -1 for missing keys."""
+    codes, keys = pd.factorize(series, sort=True)
+    return codes, pd.Index(keys, name=series.name)
+
+
+def aggregate_values(codes, n_groups, values, stats):
+    """Evaluate ``stats`` for each group of ``values`` from one group index.
+
+    ``values`` is a float array aligned with ``codes``; NaNs are skipped
+    like in ``groupby``. Sums, means and deviations come from
+    ``bincount``; min, max, median and percentiles share one sort of the
+    values by group. Returns ``{stat: array}``.
+    """
+    valid = (codes >= 0) & ~np.isnan(values)
+    groups = codes[valid]
+    values = values[valid]
+    count = np.bincount(groups, minlength=n_groups)
+    has_values = count > 0
+    results = {}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if any(stat in ('sum', 'mean', 'std') for stat in stats):
+            sums = np.bincount(groups, weights=values, minlength=n_groups)
+            mean = np.where(has_values, sums / count, np.nan)
+            results['sum'] = sums
+            results['mean'] = mean
+            if 'std' in stats:
+                deviation = values - mean[groups]
+                squares = np.bincount(groups, weights=deviation * deviation, minlength=n_groups)
+                results['std'] = np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+
+        quantiles = {stat: quantile_of(stat) for stat in stats}
+        quantiles.update({'min': 0.0, 'max': 1.0, 'median': 0.5})
+        ordered = [stat for stat in stats if quantiles.get(stat) is not None]
+        if ordered:
+            # Values sorted within each group; group g occupies [starts[g], starts[g] + count[g])
+            sorted_values = values[np.lexsort((values, groups))]
+            starts = np.cumsum(count) - count
+            last = np.maximum(count - 1, 0)
+            for stat in ordered:
+                position = quantiles[stat] * last
+                low = np.floor(position).astype(np.int64)
+                high = np.ceil(position).astype(np.int64)
+                if not has_values.any():
+                    results[stat] = np.full(n_groups, np.nan)
+                    continue
+                lower = sorted_values[np.minimum(starts + low, len(sorted_values) - 1)]
+                upper = sorted_values[np.minimum(starts + high, len(sorted_values) - 1)]
+                # Linear interpolation, as in Series.quantile
+                results[stat] = np.where(has_values, lower + (upper - lower) * (position - low), np.nan)
+
+    results['count'] = count
+    return {stat: results[stat] for stat in stats}
+
+
+def _numeric_values(series):
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class GroupByEngine:
+    """Grouped aggregations cached by column version.
+
+    Group indexes are cached per key column and results per
+    ``(key, aggregations)`` until one of the columns involved changes.
+    """
+
+    def __init__(self, versions, max_results=32):
+        self.versions = versions
+        self.max_results = max_results
+        self._indexes = {}
+        self._results = {}
+
+    def group_index(self, df, key):
+        token = self.versions.token(key)
+        cached = self._indexes.get(key)
+        if cached is None or cached[0] != token:
+            record('column_scans')
+            cached = (token, group_index(df[key]))
+            self._indexes[key] = cached
+        return cached[1]
+
+    def aggregate(self, df, key, aggregations):
+        """One row per group of ``key`` and one column per (value column, statistic).
+
+        ``aggregations`` maps value columns to lists of statistics, e.g.
+        ``{'Price': ['mean', 'count'], 'Weight': ['p90']}``. Columns are
+        named like ``Price (mean)``.
+        """
+        aggregations = {col: list(stats) for col, stats in aggregations.items()}
+        for stats in aggregations.values():
+            validate_stats(stats)
+        spec = (key, tuple((col, tuple(stats)) for col, stats in aggregations.items()))
+        tokens = tuple(self.versions.token(col) for col in [key, *aggregations])
+        cached = self._results.get(spec)
+        if cached is not None and cached[0] == tokens:
+            record('cache_hits')
+            return cached[1]
+
+        record('column_scans', len(aggregations))
+        codes, keys = self.group_index(df, key)
+        columns = {}
+        for col, stats in aggregations.items():
+            values = aggregate_values(codes, len(keys), _numeric_values(df[col]), stats)
+            for stat in stats:
+                columns[f"{col} ({stat})"] = values[stat]
+        result = pd.DataFrame(columns, index=keys)
+
+        self._results.pop(spec, None)
+        self._results[spec] = (tokens, result)
+        while len(self._results) > self.max_results:
+            self._results.pop(next(iter(self._results)))
+        return result
+
+    def prune(self, columns):
+        """Drop cached indexes and results for columns that no longer exist."""
+        keep = set(columns)
+        for key in [key for key in self._indexes if key not in keep]:
+            del self._indexes[key]
+        for spec in [spec for spec in self._results
+                     if spec[0] not in keep or not keep.issuperset(col for col, _ in spec[1])]:
+            del self._results[spec]
+
+
+def preset_columns(preset):
+    """Columns a preset needs."""
+    return [preset['key'], *preset['aggregations']]
+
+
+def presets_to_json(presets):
+    return json.dumps(presets, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def presets_from_json(data):
+    """Read presets written by ``presets_to_json``."""
+    presets = json.loads(data)
+    if not isinstance(presets, dict):
+        raise ValueError("Preset file must hold a JSON object of named presets.")
+    for name, preset in presets.items():
+        if not isinstance(preset, dict) or 'key' not in preset or not isinstance(preset.get('aggregations'), dict):
+            raise ValueError(f"Preset '{name}' needs a 'key' and an 'aggregations' object.")
+        for stats in preset['aggregations'].values():
+            validate_stats(stats)
+    return presets
@@ -0,0 +1,197 @@
+"""
+Operation Log with Delta-Based Undo/Redo
+Every cleaning and encoding action is recorded as a step. Undo restores
+the step's delta (the replaced columns, the filled cells or the dropped
+rows) instead of a full snapshot of the frame; redo re-runs the step.
+"""
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import record
+
+# Default memory budget for stored undo deltas
+DEFAULT_UNDO_BYTES = 512 * 1024 ** 2
+
+
+def _nbytes(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    return 0
+
+
+class ColumnStep:
+    """A step that replaces, adds or removes whole columns.
+
+    ``transform(df)`` returns the new frame; ``columns`` lists the existing
+    columns it replaces or removes. The delta keeps those columns as they
+    were, plus the names of the columns the step added.
+    """
+
+    def __init__(self, label, transform, columns):
+        self.label = label
+        self.transform = transform
+        self.columns = list(columns)
+
+    def run(self, df):
+        after = self.transform(df)
+        old = {col: (df.columns.get_loc(col), df[col]) for col in self.columns if col in df.columns}
+        added = [col for col in after.columns if col not in df.columns]
+        record('column_copies', len(added) + sum(col in after.columns for col in old))
+        delta = {'old': old, 'added': added, 'nbytes': sum(_nbytes(s) for _, s in old.values())}
+        return after, delta
+
+    def undo(self, df, delta):
+        drop = [col for col in delta['added'] + list(delta['old']) if col in df.columns]
+        restored = df.drop(columns=drop)
+        for col, (pos, series) in sorted(delta['old'].items(), key=lambda item: item[1][0]):
+            restored.insert(pos, col, series)
+        return restored
+
+    def touched(self, delta):
+        return list(delta['old']) + delta['added']
+
+
+class FillStep:
+    """A step that fills missing cells of one column.
+
+    ``fill(series)`` returns the filled column. The delta keeps only the
+    positions and previous values of the cells that were filled.
+    """
+
+    def __init__(self, label, column, fill):
+        self.label = label
+        self.column = column
+        self.fill = fill
+
+    def run(self, df):
+        before = df[self.column]
+        filled = self.fill(before)
+        positions = np.flatnonzero(before.isna().to_numpy() & filled.notna().to_numpy())
+        old = before.iloc[positions]
+        delta = {'positions': positions, 'old': old, 'dtype': before.dtype,
+                 'nbytes': positions.nbytes + _nbytes(old)}
+        record('column_copies')
+        after = df.copy(deep=False)
+        after[self.column] = filled
+        return after, delta
+
+    def undo(self, df, delta):
+        series = df[self.column].copy()
+        if series.dtype != delta['dtype']:
+            series = series.astype(object)
+        series.iloc[delta['positions']] = delta['old'].to_numpy()
+        record('column_copies')
+        restored = df.copy(deep=False)
+        restored[self.column] = series.astype(delta['dtype'])
+        return restored
+
+    def touched(self, delta):
+        return [self.column]
+
+
+class RowStep:
+    """A step that drops rows selected by ``select(df)`` (a boolean mask).
+
+    The delta keeps the dropped rows and their positions so undo can put
+    them back in their original order.
+    """
+
+    def __init__(self, label, select):
+        self.label = label
+        self.select = select
+
+    def run(self, df):
+        mask = np.asarray(self.select(df), dtype=bool)
+        positions = np.flatnonzero(mask)
+        rows = df.iloc[positions]
+        delta = {'positions': positions, 'rows': rows, 'nbytes': positions.nbytes + _nbytes(rows)}
+        record('frame_copies')
+        return df[~mask], delta
+
+    def undo(self, df, delta):
+        positions = delta['positions']
+        if len(positions) == 0:
+            return df
+        total = len(df) + len(positions)
+        kept = np.setdiff1d(np.arange(total), positions, assume_unique=True)
+        record('frame_copies')
+        combined = pd.concat([df, delta['rows']])
+        order = np.argsort(np.concatenate([kept, positions]), kind='stable')
+        return combined.iloc[order]
+
+    def touched(self, delta):
+        # Row changes affect every column
+        return None
+
+
+class OperationLog:
+    """Undo/redo stacks of applied steps with a memory budget for deltas.
+
+    When the stored deltas exceed ``max_bytes``, the oldest steps are
+    forgotten and can no longer be undone. The latest step is always
+    kept, even when its delta alone is over the budget.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_UNDO_BYTES):
+        self.max_bytes = max_bytes
+        self._undo = []
+        self._redo = []
+        self.forgotten = 0
+
+    @property
+    def nbytes(self):
+        return sum(delta['nbytes'] for _, delta in self._undo)
+
+    @property
+    def can_undo(self):
+        return len(self._undo) > 0
+
+    @property
+    def can_redo(self):
+        return len(self._redo) > 0
+
+    def history(self):
+        """Labels of the steps that can be undone, oldest first."""
+        return [step.label for step, _ in self._undo]
+
+    def redo_labels(self):
+        """Labels of the steps that can be redone, next one first."""
+        return [step.label for step in reversed(self._redo)]
+
+    def apply(self, df, step):
+        """Run ``step`` and record it. Returns ``(new_df, touched_columns)``."""
+        after, delta = step.run(df)
+        self._undo.append((step, delta))
+        self._redo.clear()
+        self._enforce_budget()
+        return after, step.touched(delta)
+
+    def undo(self, df):
+        """Revert the latest step. Returns ``(df, touched_columns, step)``."""
+        step, delta = self._undo.pop()
+        self._redo.append(step)
+        return step.undo(df, delta), step.touched(delta), step
+
+    def redo(self, df):
+        """Re-run the latest undone step. Returns ``(df, touched_columns, step)``."""
+        step = self._redo.pop()
+        after, delta = step.run(df)
+        self._undo.append((step, delta))
+        self._enforce_budget()
+        return after, step.touched(delta), step
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self.forgotten = 0
+
+    def _enforce_budget(self):
+        # The step just applied stays undoable, so its own history entry is never lost
+        while len(self._undo) > 1 and self.nbytes > self.max_bytes:
+            self._undo.pop(0)
+            self.forgotten += 1
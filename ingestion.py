@@ -0,0 +1,240 @@
+"""
+Data Ingestion for the Streamlit App
+Parses each distinct upload once and keeps parsed frames in a bounded cache
+keyed by a hash of the uploaded bytes and the load options.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from compaction import compact_frame
+
+try:
+    import psutil
+except ImportError:  # optional, used for resident memory telemetry
+    psutil = None
+
+# Cache limits (entries and total in-memory size of the cached frames)
+DEFAULT_MAX_ENTRIES = 4
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def hash_bytes(data):
+    """Return a hex digest identifying the content of an upload."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(memoryview(data))
+    return digest.hexdigest()
+
+
+def frame_nbytes(df):
+    """Approximate in-memory size of a DataFrame in bytes."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class FrameCache:
+    """Bounded LRU cache of parsed DataFrames keyed by content hash.
+
+    Entries are evicted least-recently-used first once either the entry
+    count or the total frame size goes over its limit. The most recently
+    added frame is always kept, even if it alone exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._sizes = {}
+        self._meta = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._frames
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frames)
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def get(self, key):
+        with self._lock:
+            df = self._frames.get(key)
+            if df is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return df
+
+    def get_meta(self, key):
+        """Return the metadata stored alongside a cached frame."""
+        with self._lock:
+            return self._meta.get(key)
+
+    def put(self, key, df, meta=None):
+        size = frame_nbytes(df)
+        with self._lock:
+            self._frames[key] = df
+            self._sizes[key] = size
+            self._meta[key] = meta
+            self._frames.move_to_end(key)
+            self._evict()
+        return df
+
+    def discard(self, key):
+        with self._lock:
+            self._frames.pop(key, None)
+            self._sizes.pop(key, None)
+            self._meta.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._sizes.clear()
+            self._meta.clear()
+
+    def _evict(self):
+        while len(self._frames) > 1 and (
+            len(self._frames) > self.max_entries
+            or sum(self._sizes.values()) > self.max_bytes
+        ):
+            key, _ = self._frames.popitem(last=False)
+            self._sizes.pop(key, None)
+            self._meta.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._frames),
+                'bytes': sum(self._sizes.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def resident_memory_bytes():
+    """Current resident set size of this process, or None if it cannot be read."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        # Second field: resident pages
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_memory_bytes():
+    """Peak resident set size of this process so far, or None if it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def read_header(data):
+    """Return the column names of CSV bytes without parsing the body."""
+    return pd.read_csv(io.BytesIO(data), nrows=0).columns.tolist()
+
+
+def parse_schema(text):
+    """Parse ``column: dtype`` lines into a dtype mapping for read_csv."""
+    schema = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if ':' not in line:
+            raise ValueError(f"Expected 'column: dtype', got '{line}'")
+        column, dtype = line.rsplit(':', 1)
+        schema[column.strip()] = dtype.strip()
+    return schema
+
+
+def read_csv(data, engine='c', arrow_dtypes=False, dtype=None, usecols=None):
+    """Parse CSV bytes with the given load options.
+
+    ``engine='pyarrow'`` parses on all cores. ``arrow_dtypes`` keeps the
+    Arrow-backed dtypes instead of converting to NumPy/object columns.
+    ``dtype`` is an optional column schema and ``usecols`` a column
+    projection applied while parsing.
+    """
+    kwargs = {}
+    if engine == 'pyarrow':
+        kwargs['engine'] = 'pyarrow'
+    if arrow_dtypes:
+        kwargs['dtype_backend'] = 'pyarrow'
+    if dtype:
+        kwargs['dtype'] = dtype
+    if usecols:
+        kwargs['usecols'] = list(usecols)
+    return pd.read_csv(io.BytesIO(data), **kwargs)
+
+
+def options_key(options):
+    """Stable string form of load options for use in cache keys."""
+    return json.dumps(options or {}, sort_keys=True, default=str)
+
+
+def load_csv(data, cache, options=None, key=None, compact=False):
+    """Parse CSV bytes, reusing a cached frame for identical content.
+
+    Returns ``(key, df, from_cache, stats)`` where ``stats`` holds the
+    parse time, throughput and resident memory after loading. With
+    ``compact`` the frame is passed through ``compact_frame`` before it
+    is cached and ``stats['compaction']`` holds the memory report. The
+    returned frame is the cached object itself; callers that mutate it
+    must take a copy first.
+    """
+    options = options or {}
+    if key is None:
+        key = hash_bytes(data)
+    if options or compact:
+        variant = options_key({'options': options, 'compact': compact})
+        key = f"{key}-{hash_bytes(variant.encode())[:8]}"
+
+    df = cache.get(key)
+    if df is not None:
+        compaction = cache.get_meta(key)
+        stats = {
+            'parse_seconds': 0.0,
+            'rows': len(df),
+            'rows_per_second': None,
+            'rss_bytes': resident_memory_bytes(),
+            'compaction': compaction,
+        }
+        return key, df, True, stats
+
+    start = time.perf_counter()
+    df = read_csv(data, **options)
+    elapsed = time.perf_counter() - start
+    compaction = None
+    if compact:
+        df, compaction = compact_frame(df)
+    # The cache may hand back its own copy of the frame (e.g. memory-mapped by DatasetStore)
+    df = cache.put(key, df, meta=compaction)
+    stats = {
+        'parse_seconds': elapsed,
+        'rows': len(df),
+        'rows_per_second': len(df) / elapsed if elapsed > 0 else None,
+        'rss_bytes': resident_memory_bytes(),
+        'compaction': compaction,
+    }
+    return key, df, False, stats
@@ -0,0 +1,155 @@
+"""
+Per-Rerun Instrumentation
+Times each part of a Streamlit rerun (upload, section, chart, export),
+tracks process memory around it and counts the full-column scans and
+frame copies the data modules perform. Each finished rerun becomes one
+record that the app can show in a developer panel and append to a JSON
+Lines log.
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from ingestion import peak_memory_bytes, resident_memory_bytes
+
+# Counters recorded by the data modules
+COUNTERS = {
+    'column_scans': "Full-column scans",
+    'frame_copies': "Frame copies",
+    'column_copies': "Column copies",
+    'cache_hits': "Cache hits",
+}
+
+# Reruns kept per session for the developer panel
+DEFAULT_HISTORY = 50
+
+_local = threading.local()
+
+
+class RerunTrace:
+    """Spans and counters of one rerun.
+
+    Each span records its wall time and the change in resident memory
+    while it ran; spans can nest.
+    """
+
+    def __init__(self, session=None, rerun=None):
+        self.session = session
+        self.rerun = rerun
+        self.spans = []
+        self.counters = Counter()
+        self._start = time.perf_counter()
+        self._start_rss = resident_memory_bytes()
+        self._depth = 0
+        self._open = {}
+        self.seconds = None
+
+    def begin(self, name, kind='section'):
+        """Open a span; pass the returned entry to ``end``."""
+        entry = {'name': name, 'kind': kind, 'depth': self._depth}
+        self.spans.append(entry)
+        self._depth += 1
+        self._open[id(entry)] = (time.perf_counter(), resident_memory_bytes())
+        return entry
+
+    def end(self, entry):
+        start, rss = self._open.pop(id(entry))
+        self._depth -= 1
+        entry['seconds'] = time.perf_counter() - start
+        after = resident_memory_bytes()
+        entry['rss_delta'] = after - rss if after is not None and rss is not None else None
+
+    @contextmanager
+    def span(self, name, kind='section'):
+        entry = self.begin(name, kind)
+        try:
+            yield entry
+        finally:
+            self.end(entry)
+
+    def count(self, counter, n=1):
+        self.counters[counter] += n
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self._start
+        return self
+
+    def to_record(self, **extra):
+        rss = resident_memory_bytes()
+        return {
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'session': self.session,
+            'rerun': self.rerun,
+            'seconds': self.seconds,
+            'rss_bytes': rss,
+            'peak_rss_bytes': peak_memory_bytes(),
+            'rss_delta': rss - self._start_rss if rss is not None and self._start_rss is not None else None,
+            'counters': dict(self.counters),
+            'spans': self.spans,
+            **extra,
+        }
+
+
+def start_rerun(session=None, rerun=None):
+    """Begin tracing the current rerun on this thread and return its trace."""
+    _local.trace = RerunTrace(session, rerun)
+    return _local.trace
+
+
+def current():
+    """The trace of the rerun running on this thread, or None."""
+    return getattr(_local, 'trace', None)
+
+
+def end_rerun():
+    trace = current()
+    _local.trace = None
+    return trace.finish() if trace is not None else None
+
+
+def record(counter, n=1):
+    """Add to a counter of the current rerun; does nothing when no rerun is traced."""
+    trace = current()
+    if trace is not None:
+        trace.count(counter, n)
+
+
+def begin(name, kind='section'):
+    """Open a span of the current rerun; returns None outside a traced rerun."""
+    trace = current()
+    return trace.begin(name, kind) if trace is not None else None
+
+
+def end(entry):
+    trace = current()
+    if trace is not None and entry is not None:
+        trace.end(entry)
+
+
+@contextmanager
+def span(name, kind='section'):
+    """Time a block as part of the current rerun (a no-op outside a traced rerun)."""
+    trace = current()
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, kind) as entry:
+        yield entry
+
+
+class JsonlLog:
+    """Appends rerun records to a JSON Lines file; safe to share between sessions."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
@@ -0,0 +1,288 @@
+"""
+Headless Cleaning Pipeline
+Runs the app's cleaning and encoding operations without Streamlit, from a
+declarative JSON pipeline file, and processes a directory of CSV files in
+parallel on a process pool.
+
+Usage:
+    python pipeline.py pipeline.json data/ --output cleaned/ --format Parquet --workers 8
+
+A pipeline file looks like:
+
+    {
+      "load": {"engine": "pyarrow"},
+      "steps": [
+        {"op": "convert_numeric", "columns": ["Ram", "Weight"]},
+        {"op": "fill_missing", "column": "Price", "method": "Median"},
+        {"op": "drop_missing", "how": "any"},
+        {"op": "drop_duplicates", "keep": "first"},
+        {"op": "drop_columns", "columns": ["Gpu"]},
+        {"op": "one_hot", "columns": ["Company"], "max_categories": 20},
+        {"op": "label_encode", "columns": ["TypeName"], "mappings": "label_mappings.json"}
+      ],
+      "export": {"format": "CSV"}
+    }
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cleaning import DEFAULT_UNITS, FILL_METHODS, convert_numeric, drop_columns, fill_missing, missing_rows_mask
+from compaction import compact_frame
+from encoding import OTHER_LABEL, label_encode, mappings_from_json, one_hot_encode
+from exporting import EXPORT_FORMATS, export_file, export_filename
+from ingestion import read_csv
+
+# Load options passed to ingestion.read_csv; "compact" runs compact_frame after parsing
+LOAD_OPTIONS = ['engine', 'arrow_dtypes', 'dtype', 'usecols', 'compact']
+
+DEFAULT_FORMAT = 'CSV'
+
+
+def _convert_numeric(df, step):
+    units = step.get('units', DEFAULT_UNITS)
+    df, coerced = convert_numeric(df, step['columns'], units, max_workers=step.get('workers', 1))
+    return df, {'coerced': coerced}
+
+
+def _fill_missing(df, step):
+    column = step['column']
+    missing = int(df[column].isna().sum())
+    filled = fill_missing(df[column], step['method'], step.get('value'))
+    df = df.copy(deep=False)
+    df[column] = filled
+    return df, {'filled': missing - int(filled.isna().sum())}
+
+
+def _drop_missing(df, step):
+    subset = step.get('subset')
+    mask = missing_rows_mask(df[subset] if subset else df, how=step.get('how', 'any'), thresh=step.get('thresh'))
+    return df[~mask], {'dropped': int(mask.sum())}
+
+
+def _drop_duplicates(df, step):
+    mask = df.duplicated(subset=step.get('subset') or None, keep=step.get('keep', 'first')).to_numpy()
+    return df[~mask], {'dropped': int(mask.sum())}
+
+
+def _drop_columns(df, step):
+    return drop_columns(df, step['columns']), {}
+
+
+def _one_hot(df, step):
+    encoded = one_hot_encode(df, step['columns'], sparse=step.get('sparse', False),
+                             max_categories=step.get('max_categories'), other=step.get('other', OTHER_LABEL))
+    return encoded, {'new_columns': len(encoded.columns) - len(df.columns) + len(step['columns'])}
+
+
+def _label_encode(df, step):
+    df, _, unseen = label_encode(df, step['columns'], step.get('mappings'))
+    return df, {'unseen': {col: count for col, count in unseen.items() if count}}
+
+
+# Pipeline operations: name -> (function(df, step) -> (df, info), required keys)
+OPERATIONS = {
+    'convert_numeric': (_convert_numeric, ['columns']),
+    'fill_missing': (_fill_missing, ['column', 'method']),
+    'drop_missing': (_drop_missing, []),
+    'drop_duplicates': (_drop_duplicates, []),
+    'drop_columns': (_drop_columns, ['columns']),
+    'one_hot': (_one_hot, ['columns']),
+    'label_encode': (_label_encode, ['columns']),
+}
+
+
+def validate_pipeline(pipeline):
+    """Check the structure of a pipeline dict; raises ValueError on the first problem."""
+    if not isinstance(pipeline, dict) or not isinstance(pipeline.get('steps', []), list):
+        raise ValueError("A pipeline must be a JSON object with a 'steps' list.")
+    unknown = [key for key in pipeline.get('load', {}) if key not in LOAD_OPTIONS]
+    if unknown:
+        raise ValueError(f"Unknown load option(s): {', '.join(unknown)}")
+    fmt = pipeline.get('export', {}).get('format', DEFAULT_FORMAT)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    for i, step in enumerate(pipeline.get('steps', []), 1):
+        op = step.get('op') if isinstance(step, dict) else None
+        if op not in OPERATIONS:
+            raise ValueError(f"Step {i}: unknown operation {op!r}")
+        missing = [key for key in OPERATIONS[op][1] if key not in step]
+        if missing:
+            raise ValueError(f"Step {i} ({op}): missing {', '.join(missing)}")
+        if op == 'fill_missing' and step['method'] not in FILL_METHODS:
+            raise ValueError(f"Step {i} ({op}): unknown fill method {step['method']!r}")
+        if op == 'drop_duplicates' and step.get('keep', 'first') not in ('first', 'last', False):
+            raise ValueError(f"Step {i} ({op}): keep must be 'first', 'last' or false")
+    return pipeline
+
+
+def load_pipeline(path):
+    """Read and validate a pipeline file.
+
+    Label mappings (``{column: {label: code}}``, inline or as a file name
+    relative to the pipeline file) are read up front, so every file is
+    encoded with the same codes.
+    """
+    with open(path, encoding='utf-8') as f:
+        pipeline = validate_pipeline(json.load(f))
+    base = os.path.dirname(os.path.abspath(path))
+    for step in pipeline.get('steps', []):
+        mappings = step.get('mappings') if step['op'] == 'label_encode' else None
+        if isinstance(mappings, str):
+            with open(os.path.join(base, mappings), 'rb') as f:
+                step['mappings'] = mappings_from_json(f.read())
+        elif mappings is not None:
+            step['mappings'] = mappings_from_json(json.dumps(mappings))
+    return pipeline
+
+
+def run_pipeline(df, pipeline):
+    """Apply the pipeline's steps to ``df``.
+
+    Returns ``(new_df, report)`` with one entry per step: the operation,
+    its run time, the resulting shape and any step-specific counts.
+    """
+    report = []
+    for step in pipeline.get('steps', []):
+        function, _ = OPERATIONS[step['op']]
+        start = time.perf_counter()
+        df, info = function(df, step)
+        report.append({'op': step['op'], 'seconds': time.perf_counter() - start,
+                       'rows': len(df), 'columns': len(df.columns), **info})
+    return df, report
+
+
+def load_file(path, load=None):
+    """Parse a CSV file with the pipeline's load options."""
+    options = dict(load or {})
+    compact = options.pop('compact', False)
+    with open(path, 'rb') as f:
+        df = read_csv(f.read(), **options)
+    if compact:
+        df, _ = compact_frame(df)
+    return df
+
+
+def output_stems(paths):
+    """Output file name (without extension) of each input, numbered ``_2``, ``_3``, ... where names repeat."""
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    # Compared case-insensitively, as some file systems are
+    taken = {stem.lower() for stem in stems}
+    seen, unique = set(), []
+    for stem in stems:
+        name, n = stem, 1
+        if name.lower() in seen:
+            # Skip numbers that another input already uses as its own name
+            while name.lower() in taken:
+                n += 1
+                name = f"{stem}_{n}"
+            taken.add(name.lower())
+        seen.add(name.lower())
+        unique.append(name)
+    return unique
+
+
+def process_file(path, pipeline, output_dir, fmt=None, stem=None):
+    """Load, clean and export one file; returns a result dict with timings (never raises).
+
+    The output is named after the input file unless ``stem`` is given.
+    """
+    fmt = fmt or pipeline.get('export', {}).get('format', DEFAULT_FORMAT)
+    stem = stem or os.path.splitext(os.path.basename(path))[0]
+    result = {'file': path, 'output': os.path.join(output_dir, export_filename(fmt, stem)), 'error': None}
+    try:
+        start = time.perf_counter()
+        df = load_file(path, pipeline.get('load'))
+        result['rows_in'] = len(df)
+        result['load_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df, result['steps'] = run_pipeline(df, pipeline)
+        result['rows_out'] = len(df)
+        result['steps_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        export_file(df, fmt, result['output'])
+        result['export_seconds'] = time.perf_counter() - start
+    except Exception as e:  # reported per file so one bad file does not stop the batch
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def run_batch(paths, pipeline, output_dir, fmt=None, max_workers=None):
+    """Process files on a process pool, yielding each result as soon as its file is done.
+
+    ``max_workers=1`` runs in this process, in order. Inputs with the
+    same file name (e.g. ``a/data.csv`` and ``b/data.csv``) get numbered
+    output names so they do not overwrite each other.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stems = output_stems(paths)
+    if max_workers == 1:
+        for path, stem in zip(paths, stems):
+            yield process_file(path, pipeline, output_dir, fmt, stem)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(process_file, path, pipeline, output_dir, fmt, stem) for path, stem in zip(paths, stems)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def find_inputs(source, suffix='.csv'):
+    """CSV files in a directory (sorted), or the file itself."""
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source) if name.lower().endswith(suffix))
+    return [source]
+
+
+def format_result(result):
+    if result['error']:
+        return f"{result['file']}: FAILED {result['error']}"
+    total = result['load_seconds'] + result['steps_seconds'] + result['export_seconds']
+    return (f"{result['file']}: {result['rows_in']:,} -> {result['rows_out']:,} rows in {total:.2f}s "
+            f"(load {result['load_seconds']:.2f}s, steps {result['steps_seconds']:.2f}s, "
+            f"export {result['export_seconds']:.2f}s) -> {result['output']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a cleaning pipeline to CSV files.")
+    parser.add_argument('pipeline', help="pipeline JSON file")
+    parser.add_argument('inputs', nargs='+', help="CSV files or directories of CSV files")
+    parser.add_argument('-o', '--output', default='cleaned', help="output directory (default: cleaned)")
+    parser.add_argument('-f', '--format', choices=list(EXPORT_FORMATS), help="export format (overrides the pipeline)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--report', help="write every result, with per-step timings, to this JSON Lines file")
+    args = parser.parse_args(argv)
+
+    try:
+        pipeline = load_pipeline(args.pipeline)
+    except (OSError, ValueError) as e:
+        parser.error(f"{args.pipeline}: {e}")
+    paths = [path for source in args.inputs for path in find_inputs(source)]
+    if not paths:
+        parser.error("no CSV files found")
+
+    start = time.perf_counter()
+    failed = 0
+    report = open(args.report, 'w', encoding='utf-8') if args.report else None
+    try:
+        for done, result in enumerate(run_batch(paths, pipeline, args.output, args.format, args.workers), 1):
+            failed += result['error'] is not None
+            print(f"[{done}/{len(paths)}] {format_result(result)}", flush=True)
+            if report is not None:
+                report.write(json.dumps(result, default=str) + '\n')
+                report.flush()
+    finally:
+        if report is not None:
+            report.close()
+    print(f"Processed {len(paths) - failed}/{len(paths)} file(s) in {time.perf_counter() - start:.2f}s"
+          + (f", {failed} failed" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+Column Profiling with Version-Based Caching
+Per-column statistics are cached against a per-column version counter, so
+a cleaning step only invalidates the columns it touches. Statistics for
+many columns at once are computed concurrently on a thread pool.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import record
+from sketches import ColumnSketch
+
+# Row order of df.describe(include='all')
+DESCRIBE_ROWS = ['count', 'unique', 'top', 'freq', 'first', 'last',
+                 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+def _null_count(series):
+    return int(series.isnull().sum())
+
+
+def _count(series):
+    return int(series.count())
+
+
+def _nunique(series):
+    return int(series.nunique())
+
+
+def _value_counts(series):
+    return series.value_counts()
+
+
+def _describe(series):
+    return series.describe()
+
+
+class ColumnVersions:
+    """Version counters for a working DataFrame.
+
+    ``frame`` changes on every modification. A column's token changes
+    whenever that column is modified, or when all columns are bumped
+    (for example after rows are dropped).
+    """
+
+    def __init__(self):
+        self.frame = 0
+        self._base = 0
+        self._columns = {}
+
+    def token(self, col):
+        return (self._base, self._columns.get(col, 0))
+
+    def bump(self, columns=None):
+        """Record a change to ``columns``, or to every column if None."""
+        self.frame += 1
+        if columns is None:
+            self._base += 1
+            self._columns.clear()
+            return
+        for col in columns:
+            self._columns[col] = self._columns.get(col, 0) + 1
+
+
+class ColumnProfileCache:
+    """Caches column statistics until the column's version changes.
+
+    ``max_workers`` bounds the threads used to profile several columns at
+    once (None = the executor default, 1 = no pool).
+    """
+
+    def __init__(self, versions, max_workers=None):
+        self.versions = versions
+        self.max_workers = max_workers
+        self._column_stats = {}
+        self._frame_stats = {}
+        self.hits = 0
+        self.misses = 0
+
+    def column_stat(self, df, col, name, compute):
+        """Return ``compute(df[col])``, cached by column version."""
+        token = self.versions.token(col)
+        cached = self._column_stats.get((name, col))
+        if cached is not None and cached[0] == token:
+            self.hits += 1
+            record('cache_hits')
+            return cached[1]
+        self.misses += 1
+        record('column_scans')
+        value = compute(df[col])
+        self._column_stats[(name, col)] = (token, value)
+        return value
+
+    def column_stats(self, df, columns, name, compute):
+        """``[compute(df[col]) for col in columns]``, cached by column version.
+
+        Columns without a current cached value are computed concurrently;
+        the NumPy and pandas kernels behind most statistics release the GIL.
+        """
+        values = {}
+        missing = []
+        for col in columns:
+            cached = self._column_stats.get((name, col))
+            if cached is not None and cached[0] == self.versions.token(col):
+                self.hits += 1
+                record('cache_hits')
+                values[col] = cached[1]
+            elif col not in missing:
+                missing.append(col)
+        if missing:
+            self.misses += len(missing)
+            record('column_scans', len(missing))
+            tokens = [self.versions.token(col) for col in missing]
+            series = [df[col] for col in missing]
+            if len(missing) == 1 or self.max_workers == 1:
+                results = [compute(s) for s in series]
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    results = list(pool.map(compute, series))
+            for col, token, value in zip(missing, tokens, results):
+                self._column_stats[(name, col)] = (token, value)
+                values[col] = value
+        return [values[col] for col in columns]
+
+    def frame_stat(self, df, name, compute):
+        """Return ``compute(df)``, cached until any column changes."""
+        cached = self._frame_stats.get(name)
+        if cached is not None and cached[0] == self.versions.frame:
+            self.hits += 1
+            record('cache_hits')
+            return cached[1]
+        self.misses += 1
+        record('column_scans', len(df.columns))
+        value = compute(df)
+        self._frame_stats[name] = (self.versions.frame, value)
+        return value
+
+    def prune(self, columns):
+        """Drop cached statistics for columns that no longer exist."""
+        keep = set(columns)
+        for key in [key for key in self._column_stats if key[1] not in keep]:
+            del self._column_stats[key]
+
+    def null_count(self, df, col):
+        return self.column_stat(df, col, 'null_count', _null_count)
+
+    def count(self, df, col):
+        return self.column_stat(df, col, 'count', _count)
+
+    def nunique(self, df, col):
+        return self.column_stat(df, col, 'nunique', _nunique)
+
+    def value_counts(self, df, col):
+        return self.column_stat(df, col, 'value_counts', _value_counts)
+
+    def describe_column(self, df, col):
+        return self.column_stat(df, col, 'describe', _describe)
+
+    def sketch(self, df, col):
+        """Mergeable approximate-statistics sketch of a column (see sketches.py)."""
+        return self.column_stat(df, col, 'sketch', ColumnSketch.build)
+
+    def approx_nunique(self, df, col):
+        """``(estimate, relative_error)`` of the distinct values in a column."""
+        return self.sketch(df, col).nunique()
+
+    def approx_value_counts(self, df, col, n):
+        return self.sketch(df, col).value_counts(n)
+
+    def approx_describe(self, df, columns=None):
+        """``(values, bounds)`` frames shaped like ``describe()``, built from column sketches."""
+        columns = list(df.columns if columns is None else columns)
+        if not columns:
+            return pd.DataFrame(), pd.DataFrame()
+        # Columns are sketched in parallel, so each sketch is built on a single thread
+        sketches = self.column_stats(df, columns, 'sketch', lambda s: ColumnSketch.build(s, max_workers=1))
+        parts = [sketch.describe() for sketch in sketches]
+        values = pd.concat([part[0].rename(col) for part, col in zip(parts, columns)], axis=1)
+        bounds = pd.concat([part[1].rename(col) for part, col in zip(parts, columns)], axis=1)
+        order = [row for row in DESCRIBE_ROWS if row in values.index]
+        return values.reindex(order), bounds.reindex(order).fillna("")
+
+    def null_counts(self, df):
+        """Missing values per column, like ``df.isnull().sum()``."""
+        return pd.Series(self.column_stats(df, df.columns, 'null_count', _null_count),
+                         index=df.columns, dtype=np.int64)
+
+    def counts(self, df):
+        """Non-null values per column, like ``df.count()``."""
+        return pd.Series(self.column_stats(df, df.columns, 'count', _count), index=df.columns, dtype=np.int64)
+
+    def nuniques(self, df, columns=None):
+        """Distinct non-missing values per column, like ``df.nunique()``."""
+        columns = list(df.columns if columns is None else columns)
+        return pd.Series(self.column_stats(df, columns, 'nunique', _nunique), index=columns, dtype=np.int64)
+
+    def describe(self, df, columns=None):
+        """Summary statistics assembled from cached per-column describes.
+
+        Matches ``df.describe(include='all')`` when ``columns`` is None.
+        """
+        columns = list(df.columns if columns is None else columns)
+        if not columns:
+            return pd.DataFrame()
+        parts = [part.rename(col) for part, col in zip(self.column_stats(df, columns, 'describe', _describe), columns)]
+        result = pd.concat(parts, axis=1)
+        order = [row for row in DESCRIBE_ROWS if row in result.index]
+        order += [row for row in result.index if row not in order]
+        return result.reindex(order)
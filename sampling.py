@@ -0,0 +1,111 @@
+"""
+Row Sampling for Interactive Visualization
+Seeded uniform, reservoir and stratified samples of a DataFrame, cached
+per dataset version so charts on large frames stay interactive.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import record
+
+SAMPLING_METHODS = ["Uniform", "Reservoir", "Stratified"]
+
+DEFAULT_SAMPLE_ROWS = 100_000
+DEFAULT_SEED = 42
+
+# Rows consumed per step by the streaming reservoir sampler
+RESERVOIR_CHUNK_ROWS = 1_000_000
+
+
+def uniform_sample(df, n, seed=DEFAULT_SEED):
+    """``n`` rows drawn uniformly without replacement, in original row order."""
+    if n >= len(df):
+        return df
+    rng = np.random.default_rng(seed)
+    positions = np.sort(rng.choice(len(df), size=n, replace=False))
+    return df.iloc[positions]
+
+
+def reservoir_sample(df, n, seed=DEFAULT_SEED, chunk_rows=RESERVOIR_CHUNK_ROWS):
+    """``n`` rows chosen by streaming over ``df`` in chunks.
+
+    Each row gets a random priority and the reservoir keeps the ``n``
+    lowest priorities seen so far, so only the reservoir and one chunk
+    of priorities are held at a time.
+    """
+    if n >= len(df):
+        return df
+    rng = np.random.default_rng(seed)
+    kept_positions = np.empty(0, dtype=np.int64)
+    kept_keys = np.empty(0, dtype=np.float64)
+    for start in range(0, len(df), chunk_rows):
+        stop = min(start + chunk_rows, len(df))
+        positions = np.concatenate([kept_positions, np.arange(start, stop, dtype=np.int64)])
+        keys = np.concatenate([kept_keys, rng.random(stop - start)])
+        if len(keys) > n:
+            best = np.argpartition(keys, n - 1)[:n]
+            positions, keys = positions[best], keys[best]
+        kept_positions, kept_keys = positions, keys
+    return df.iloc[np.sort(kept_positions)]
+
+
+def stratified_sample(df, n, column, seed=DEFAULT_SEED):
+    """About ``n`` rows with each category of ``column`` proportionally represented.
+
+    Every category (including missing values) keeps at least one row.
+    """
+    if n >= len(df):
+        return df
+    codes, _ = pd.factorize(df[column], use_na_sentinel=False)
+    sizes = np.bincount(codes)
+    quota = np.minimum(sizes, np.maximum(1, np.round(sizes * (n / len(df))).astype(np.int64)))
+
+    # Rows grouped by category (stable integer sort), then `quota` picks per group
+    rng = np.random.default_rng(seed)
+    order = np.argsort(codes, kind='stable')
+    group_starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    chosen = np.concatenate([
+        order[start + rng.choice(size, size=k, replace=False)]
+        for start, size, k in zip(group_starts, sizes, quota)
+    ])
+    return df.iloc[np.sort(chosen)]
+
+
+def draw_sample(df, method, n, seed=DEFAULT_SEED, column=None):
+    if method == "Uniform":
+        return uniform_sample(df, n, seed)
+    if method == "Reservoir":
+        return reservoir_sample(df, n, seed)
+    if method == "Stratified":
+        if column is None:
+            raise ValueError("Stratified sampling needs a category column.")
+        return stratified_sample(df, n, column, seed)
+    raise ValueError(f"Unknown sampling method: {method}")
+
+
+class SampleCache:
+    """Keeps the few most recent samples, keyed by dataset version and spec."""
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._samples = OrderedDict()
+
+    def get(self, df, version, method, n, seed=DEFAULT_SEED, column=None):
+        key = (version, method, n, seed, column)
+        sample = self._samples.get(key)
+        if sample is not None:
+            record('cache_hits')
+        else:
+            record('frame_copies')
+            sample = draw_sample(df, method, n, seed, column)
+            self._samples[key] = sample
+            while len(self._samples) > self.max_entries:
+                self._samples.popitem(last=False)
+        self._samples.move_to_end(key)
+        return sample
+
+    def clear(self):
+        self._samples.clear()
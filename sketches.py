@@ -0,0 +1,284 @@
+"""
+Approximate Column Statistics
+Mergeable sketches for very large frames: HyperLogLog distinct counts, a
+bottom-k sample for quantiles and Misra-Gries heavy hitters for top
+values. Columns are sketched chunk by chunk and the chunk sketches are
+merged, so every estimate comes with an error bound.
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# HyperLogLog uses 2 ** precision registers (relative error ~1.04 / sqrt(registers))
+DEFAULT_PRECISION = 14
+
+# Values kept by the quantile sample
+DEFAULT_SAMPLE_SIZE = 100_000
+
+# Counters kept by the heavy-hitters summary
+DEFAULT_HEAVY_HITTERS = 256
+
+# Rows sketched per chunk before merging
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+# Confidence level of the reported error bounds
+CONFIDENCE = 0.95
+
+# Standard normal quantile for CONFIDENCE, used for the HyperLogLog bound
+_Z = 1.96
+
+
+def hash_values(series):
+    """64-bit hashes of the values of ``series`` (pass it without missing values)."""
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+class HyperLogLog:
+    """Distinct-count sketch over 64-bit hashes."""
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        if len(hashes) == 0:
+            return
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # Rank = position of the first 1 bit after the index bits; the top 53
+        # bits convert to float exactly and frexp gives their bit length
+        rest = (hashes << np.uint64(self.precision)) >> np.uint64(11)
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.minimum(54 - exponent, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Small-range correction (linear counting)
+            return m * math.log(m / zeros)
+        return raw
+
+    @property
+    def relative_error(self):
+        """Relative error of ``estimate()`` at the CONFIDENCE level."""
+        return _Z * 1.04 / math.sqrt(len(self.registers))
+
+
+class QuantileSketch:
+    """Uniform sample of at most ``size`` values for quantiles.
+
+    Each value gets a random priority and the sketch keeps the ``size``
+    lowest, so two sketches merge into a uniform sample of both streams.
+    """
+
+    def __init__(self, size=DEFAULT_SAMPLE_SIZE, seed=None):
+        self.size = size
+        self.count = 0
+        self.values = np.empty(0, dtype=np.float64)
+        self.priorities = np.empty(0, dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        self._keep(np.concatenate([self.values, values]),
+                   np.concatenate([self.priorities, self._rng.random(len(values))]))
+
+    def merge(self, other):
+        self.count += other.count
+        self._keep(np.concatenate([self.values, other.values]),
+                   np.concatenate([self.priorities, other.priorities]))
+        return self
+
+    def _keep(self, values, priorities):
+        if len(values) > self.size:
+            lowest = np.argpartition(priorities, self.size - 1)[:self.size]
+            values, priorities = values[lowest], priorities[lowest]
+        self.values, self.priorities = values, priorities
+
+    def quantile(self, q):
+        if len(self.values) == 0:
+            return np.nan
+        return float(np.quantile(self.values, q))
+
+    @property
+    def rank_error(self):
+        """Bound on the rank error of ``quantile()`` as a fraction of the count (DKW inequality)."""
+        if self.count <= self.size:
+            return 0.0
+        return math.sqrt(math.log(2 / (1 - CONFIDENCE)) / (2 * self.size))
+
+
+class HeavyHitters:
+    """Misra-Gries summary of the most frequent values.
+
+    Each reported count is at most ``error`` below the true count, and
+    any value more frequent than ``error`` is reported.
+    """
+
+    def __init__(self, capacity=DEFAULT_HEAVY_HITTERS):
+        self.capacity = capacity
+        self.total = 0
+        self.counts = pd.Series(dtype=np.int64)
+
+    def add(self, values):
+        """Add a chunk of non-missing values."""
+        counts = values.value_counts(sort=False)
+        # Categorical columns also list unused categories, with a count of 0
+        self._combine(counts[counts > 0], len(values))
+
+    def merge(self, other):
+        self._combine(other.counts, other.total)
+        return self
+
+    def _combine(self, counts, total):
+        self.total += total
+        merged = counts if self.counts.empty else self.counts.add(counts, fill_value=0)
+        merged = merged.astype(np.int64)
+        if len(merged) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count and keep what stays positive
+            cut = len(merged) - self.capacity - 1
+            threshold = np.partition(merged.to_numpy(), cut)[cut]
+            merged = merged[merged > threshold] - threshold
+        self.counts = merged
+
+    @property
+    def error(self):
+        """Maximum undercount of any reported count."""
+        return int((self.total - int(self.counts.sum())) // (self.capacity + 1))
+
+    def top(self, n):
+        """The ``n`` most frequent values and their (under)counts, like ``value_counts().head(n)``."""
+        return self.counts.sort_values(ascending=False, kind='stable').head(n).rename('count')
+
+
+class ColumnSketch:
+    """Count, distinct count and top values of a column, plus moments and quantiles if it is numeric."""
+
+    def __init__(self, numeric, precision=DEFAULT_PRECISION, sample_size=DEFAULT_SAMPLE_SIZE,
+                 heavy_hitters=DEFAULT_HEAVY_HITTERS, seed=0):
+        self.numeric = numeric
+        self.rows = 0
+        self.count = 0
+        self.distinct = HyperLogLog(precision)
+        self.top_values = HeavyHitters(heavy_hitters)
+        self.quantiles = QuantileSketch(sample_size, seed) if numeric else None
+        # Mean and sum of squared deviations of the non-missing values (exact)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    @classmethod
+    def build(cls, series, chunk_rows=DEFAULT_CHUNK_ROWS, max_workers=None, **options):
+        """Sketch ``series`` in chunks on a thread pool and merge the chunk sketches."""
+        numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+        def sketch_chunk(start):
+            chunk = cls(numeric, seed=start, **options)
+            chunk.add(series.iloc[start:start + chunk_rows])
+            return chunk
+
+        sketch = cls(numeric, **options)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for chunk in pool.map(sketch_chunk, range(0, len(series), chunk_rows)):
+                sketch.merge(chunk)
+        return sketch
+
+    def add(self, series):
+        values = series.dropna()
+        self.distinct.add_hashes(hash_values(values))
+        self.top_values.add(values)
+        if self.numeric and len(values) > 0:
+            numbers = values.to_numpy(dtype=np.float64)
+            mean = float(numbers.mean())
+            self.quantiles.add(numbers)
+            self._merge_moments(len(numbers), mean, float(np.sum((numbers - mean) ** 2)),
+                                float(numbers.min()), float(numbers.max()))
+        self.rows += len(series)
+        self.count += len(values)
+
+    def merge(self, other):
+        self.distinct.merge(other.distinct)
+        self.top_values.merge(other.top_values)
+        if self.numeric:
+            self.quantiles.merge(other.quantiles)
+            if other.count:
+                self._merge_moments(other.count, other.mean, other.m2, other.min, other.max)
+        self.rows += other.rows
+        self.count += other.count
+        return self
+
+    def _merge_moments(self, count, mean, m2, low, high):
+        # Chan et al. pairwise update; runs before self.count includes `count`
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.min = low if np.isnan(self.min) else min(self.min, low)
+        self.max = high if np.isnan(self.max) else max(self.max, high)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def nunique(self):
+        """Estimated distinct non-missing values; small counts are exact from the top-values summary."""
+        if int(self.top_values.counts.sum()) == self.top_values.total:
+            # Nothing was ever evicted, so the summary holds every distinct value
+            return len(self.top_values.counts), 0.0
+        return int(round(self.distinct.estimate())), self.distinct.relative_error
+
+    def describe(self):
+        """``(values, bounds)`` Series shaped like ``Series.describe()``.
+
+        ``bounds`` describes the error of each value: empty when exact.
+        """
+        if self.numeric:
+            rank = self.quantiles.rank_error
+            bound = f"rank ±{rank:.2%}" if rank else ""
+            values = {'count': self.count, 'mean': self.mean if self.count else np.nan, 'std': self.std,
+                      'min': self.min, '25%': self.quantiles.quantile(0.25),
+                      '50%': self.quantiles.quantile(0.5), '75%': self.quantiles.quantile(0.75), 'max': self.max}
+            bounds = {'25%': bound, '50%': bound, '75%': bound}
+        else:
+            unique, unique_error = self.nunique()
+            top = self.top_values.top(1)
+            error = self.top_values.error
+            values = {'count': self.count, 'unique': unique,
+                      'top': top.index[0] if len(top) else np.nan, 'freq': int(top.iloc[0]) if len(top) else np.nan}
+            bounds = {'unique': f"±{unique_error:.1%}" if unique_error else "",
+                      'freq': f"+{error:,}" if error else "", 'top': "approximate" if error else ""}
+        values = pd.Series(values, dtype=object)
+        return values, pd.Series({key: bounds.get(key, "") for key in values.index}, dtype=object)
+
+    def value_counts(self, n):
+        """The ``n`` most frequent values with their estimated counts and maximum undercount."""
+        top = self.top_values.top(n)
+        return pd.DataFrame({'count': top, 'max undercount': self.top_values.error}).rename_axis(None)
+
+
+def with_bounds(values, bounds):
+    """Format values and their error bounds as text, e.g. ``1,234 (±1.6%)``."""
+    def cell(value, bound):
+        if isinstance(value, float) and math.isnan(value):
+            return ""
+        if isinstance(value, (int, np.integer)):
+            text = f"{value:,}"
+        elif isinstance(value, float):
+            text = f"{value:,.4g}"
+        else:
+            text = str(value)
+        return f"{text} ({bound})" if bound else text
+    return pd.DataFrame({col: [cell(v, b) for v, b in zip(values[col], bounds[col])] for col in values.columns},
+                        index=values.index)
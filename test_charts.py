@@ -0,0 +1,36 @@
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from charts import aggregated_scatter, scatter_plot
+
+
+def _frame(rows=3150):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'Price': rng.uniform(0, 100, rows),
+        'Inches': rng.uniform(13, 17, rows),
+        'Company': rng.choice(['Dell', 'HP', 'Asus'], rows),
+    })
+
+
+def test_aggregated_scatter_same_column_for_x_and_y():
+    fig = aggregated_scatter(_frame(), 'Price', 'Price')
+    assert "3,150 points" in fig.axes[0].get_title()
+    plt.close(fig)
+
+
+def test_aggregated_scatter_same_column_with_hue():
+    fig = aggregated_scatter(_frame(), 'Price', 'Price', hue='Company')
+    assert [text.get_text() for text in fig.axes[0].get_legend().get_texts()] == ['Asus', 'Dell', 'HP']
+    plt.close(fig)
+
+
+def test_scatter_plot_aggregates_same_column_above_threshold():
+    fig = scatter_plot(_frame(), 'Price', 'Price', hue='Company', aggregate_above=1000)
+    assert "aggregated" in fig.axes[0].get_title()
+    plt.close(fig)
@@ -0,0 +1,16 @@
+import pandas as pd
+import pytest
+
+from encoding import mappings_from_json, one_hot_encode
+
+
+def test_non_integer_codes_are_rejected():
+    for codes in ['{"x": "0", "y": 1}', '{"x": true, "y": 0}', '{"x": 0.0, "y": 1}']:
+        with pytest.raises(ValueError, match="without gaps"):
+            mappings_from_json(f'{{"a": {codes}}}')
+
+
+def test_one_hot_skips_unused_categories():
+    df = pd.DataFrame({'a': pd.Categorical(['x', 'y', 'x'], categories=list('xyzw'))})
+    assert list(one_hot_encode(df, ['a']).columns) == ['a_x', 'a_y']
+    assert list(one_hot_encode(df, ['a'], max_categories=1).columns) == ['a_x', 'a_other']
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from history import ColumnStep, OperationLog
+
+
+def test_latest_step_is_kept_over_budget():
+    df = pd.DataFrame({'a': range(1000)})
+    log = OperationLog(max_bytes=1)
+    for label in ['first', 'second']:
+        df, _ = log.apply(df, ColumnStep(label, lambda frame: frame.assign(a=frame['a'] + 1), ['a']))
+    assert log.history() == ['second']
+    assert log.forgotten == 1
+    df, _, _ = log.undo(df)
+    assert df['a'].iloc[0] == 1
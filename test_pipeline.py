@@ -0,0 +1,6 @@
+from pipeline import output_stems
+
+
+def test_repeated_file_names_get_numbered_outputs():
+    paths = ['a/data.csv', 'b/data.csv', 'c/Data.csv', 'data_2.csv', 'other.csv']
+    assert output_stems(paths) == ['data', 'data_3', 'Data_4', 'data_2', 'other']
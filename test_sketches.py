@@ -0,0 +1,10 @@
+import pandas as pd
+
+from sketches import ColumnSketch
+
+
+def test_unused_categories_are_not_counted():
+    series = pd.Series(pd.Categorical(['a', 'a', 'b'], categories=list('abcde')))
+    sketch = ColumnSketch.build(series)
+    assert sketch.nunique() == (2, 0.0)
+    assert sketch.value_counts(10)['count'].to_dict() == {'a': 2, 'b': 1}
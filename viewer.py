@@ -0,0 +1,144 @@
+"""
+Paginated Data Viewer
+Serves one page of the working DataFrame at a time, with column
+selection, sorting and filtering done on the server. Sort orders and
+filter masks are cached per dataset version, so paging through a sorted
+or filtered view only slices the rows of the current page.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import record
+
+PAGE_SIZES = [50, 100, 500, 1000]
+
+DEFAULT_PAGE_ROWS = 100
+
+# Most rows the head/tail previews send to the browser; larger views go through pages
+MAX_PREVIEW_ROWS = 1000
+
+FILTER_OPERATORS = ["contains", "==", "!=", ">", ">=", "<", "<=", "is missing", "is not missing"]
+
+
+def sort_order(series, ascending=True):
+    """Row positions that sort ``series`` (stable, missing values last)."""
+    record('column_scans')
+    series = series.reset_index(drop=True)
+    try:
+        ordered = series.sort_values(ascending=ascending, kind='stable', na_position='last')
+    except TypeError:
+        # Mixed types in an object column: sort by their text
+        ordered = series.astype(str).where(series.notna()).sort_values(
+            ascending=ascending, kind='stable', na_position='last')
+    return ordered.index.to_numpy()
+
+
+def filter_mask(series, op, value=None):
+    """Boolean mask of the rows of ``series`` that match ``op`` and ``value``.
+
+    Comparisons are numeric for numeric columns and on the text of the
+    values otherwise; ``contains`` is a case-insensitive substring match.
+    Raises ValueError if ``value`` is not a number for a numeric comparison.
+    """
+    record('column_scans')
+    present = series.notna().to_numpy()
+    if op == "is missing":
+        return ~present
+    if op == "is not missing":
+        return present
+    if op == "contains":
+        text = series.astype(str).str.contains(str(value), case=False, regex=False)
+        return text.to_numpy(dtype=bool) & present
+    if op not in FILTER_OPERATORS:
+        raise ValueError(f"Unknown filter operator: {op}")
+
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{value}' is not a number.") from None
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        value = str(value)
+        values = series.astype(str).to_numpy(dtype=object)
+    with np.errstate(invalid='ignore'):
+        if op == "==":
+            mask = values == value
+        elif op == "!=":
+            mask = values != value
+        elif op == ">":
+            mask = values > value
+        elif op == ">=":
+            mask = values >= value
+        elif op == "<":
+            mask = values < value
+        else:
+            mask = values <= value
+    return np.asarray(mask, dtype=bool) & present
+
+
+class ViewCache:
+    """Row orders for the paginated viewer, keyed by dataset version, sort and filter.
+
+    Sort orders, filter masks and the combined row positions are kept
+    for the few most recent settings.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def _get(self, key, compute):
+        value = self._entries.get(key)
+        if value is not None:
+            record('cache_hits')
+        else:
+            value = compute()
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(key)
+        return value
+
+    def rows(self, df, version, sort_by=None, ascending=True, filter_by=None):
+        """Row positions of the view, or None for all rows in their original order.
+
+        ``filter_by`` is ``(column, operator, value)`` or None.
+        """
+        if sort_by is None and filter_by is None:
+            return None
+        filter_by = tuple(filter_by) if filter_by is not None else None
+
+        def compute():
+            if sort_by is not None:
+                positions = self._get((version, 'sort', sort_by, ascending),
+                                      lambda: sort_order(df[sort_by], ascending))
+            else:
+                positions = np.arange(len(df))
+            if filter_by is not None:
+                column, op, value = filter_by
+                mask = self._get((version, 'filter', filter_by), lambda: filter_mask(df[column], op, value))
+                positions = positions[mask[positions]]
+            return positions
+
+        return self._get((version, 'rows', sort_by, ascending, filter_by), compute)
+
+    def page(self, df, version, page, page_rows=DEFAULT_PAGE_ROWS, columns=None, sort_by=None,
+             ascending=True, filter_by=None):
+        """``(rows, total, page)``: one page of the view, the number of rows in the view and the page number.
+
+        Pages count from 1; ``page`` is clamped to the last page.
+        """
+        positions = self.rows(df, version, sort_by, ascending, filter_by)
+        total = len(df) if positions is None else len(positions)
+        page = min(max(int(page), 1), max(-(-total // page_rows), 1))
+        start = (page - 1) * page_rows
+        stop = min(start + page_rows, total)
+        rows = df.iloc[start:stop] if positions is None else df.iloc[positions[start:stop]]
+        return (rows[list(columns)] if columns else rows), total, page
+
+    def clear(self):
+        self._entries.clear()